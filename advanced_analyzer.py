@@ -4,20 +4,98 @@ import logging
 from typing import List, Dict, Tuple, Optional
 import time
 import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from numba_compat import NUMBA_AVAILABLE, njit, prange
 
 logger = logging.getLogger(__name__)
 
+
+@njit(cache=True, fastmath=True)
+def _quality_kernel(num_faces, face_areas, motion_intensity, edge_density):
+    """Numeric core of AdvancedVideoProcessor.calculate_quality_score"""
+    score = 0.0
+    
+    # Face quality (0-40 points)
+    if num_faces > 0:
+        face_score = min(num_faces * 10, 40)
+        # Bonus for well-sized faces
+        for area in face_areas:
+            if 50 < area < 10000:  # Good face size
+                face_score += 5
+        score += min(face_score, 40)
+    
+    # Motion quality (0-30 points)
+    if 0.01 < motion_intensity < 0.3:  # Good amount of motion
+        score += 30
+    elif motion_intensity > 0:
+        score += 15
+    
+    # Edge quality (0-30 points)
+    if 0.1 < edge_density < 0.4:  # Good amount of detail
+        score += 30
+    elif edge_density > 0:
+        score += 15
+    
+    return min(score, 100.0)
+
+
+@njit('Tuple((float64, int64))(uint8[:, ::1], uint8[:, ::1])', cache=True, fastmath=True, parallel=True)
+def _gray_edge_stats(gray, edges):
+    """Mean brightness and edge pixel count in a single pass over the frame"""
+    height, width = gray.shape
+    total = 0
+    edge_pixels = 0
+    for i in prange(height):
+        for j in range(width):
+            total += gray[i, j]
+            if edges[i, j] > 0:
+                edge_pixels += 1
+    return total / (height * width), np.int64(edge_pixels)
+
+
+@njit('void(uint8[:, ::1], float32[:, ::1], float32, float32, uint8[:, ::1])',
+      cache=True, fastmath=True, parallel=True)
+def _running_average_mask(gray, background, alpha, threshold, mask):
+    """Classify foreground against a running-mean background and update it in place"""
+    height, width = gray.shape
+    for i in prange(height):
+        for j in range(width):
+            diff = np.float32(gray[i, j]) - background[i, j]
+            background[i, j] += alpha * diff
+            mask[i, j] = 255 if abs(diff) > threshold else 0
+
+
+if NUMBA_AVAILABLE:
+    # Compile at import so the first analyzed frame doesn't pay for it; the
+    # image kernels are compiled eagerly from their signatures
+    _quality_kernel(0, np.zeros(0, np.int64), 0.0, 0.0)
+
+
 class AdvancedVideoProcessor:
     """Enhanced video processor with advanced computer vision capabilities"""
     
-    def __init__(self):
+    def __init__(self, motion_method: str = 'mog2'):
+        # 'mog2' uses OpenCV's MOG2 model, 'running_average' a much cheaper
+        # running-mean background with a fixed difference threshold
+        self.motion_method = motion_method
         self.initialize_models()
+        
+        # Worker pool for detectors that are independent within a frame;
+        # OpenCV releases the GIL inside its C++ calls
+        self.thread_pool = ThreadPoolExecutor(max_workers=4)
         self.metrics = {
             'total_frames': 0,
             'objects_detected': 0,
-            'faces_detected': 0,
-            'processing_times': []
+            'faces_detected': 0
         }
+        
+        # Fixed-size ring buffer of the most recent processing times
+        self.processing_times = np.zeros(100, np.float64)
+        self.processing_times_index = 0
+        self.processing_times_count = 0
     
     def initialize_models(self):
         """Initialize available models"""
@@ -36,36 +114,97 @@ class AdvancedVideoProcessor:
             # Background subtractor for motion detection
             self.bg_subtractor = cv2.createBackgroundSubtractorMOG2()
             
-            # Corner detection
-            self.corner_detector = cv2.goodFeaturesToTrack
+            # Running-average background state, sized on the first frame
+            self.background_model = None
+            self.motion_mask = None
+            self.background_learning_rate = 0.05
+            self.background_threshold = 25
+            
+            # Corner detection (FAST segment test, much cheaper than Shi-Tomasi)
+            self.corner_detector = cv2.FastFeatureDetector_create(threshold=20, nonmaxSuppression=True)
             
             # Edge detection parameters
             self.canny_params = {'threshold1': 50, 'threshold2': 150}
             
+            # Structuring elements and scratch buffers reused across frames
+            self.motion_kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+            self.dilate_kernel = np.ones((2, 2), np.uint8)
+            self.annotation_buffer = None
+            
+            # Per-resolution working buffers, allocated by _bind_shape
+            self.frame_shape = None
+            self.gray_buffer = None
+            self.blurred_buffer = None
+            self.edges_buffer = None
+            self.mask_buffer = None
+            
+            # Buffers and detector state are shared, so frames are analyzed one at a time
+            self.analysis_lock = threading.Lock()
+            
+            # Run the filter chain on an NVIDIA GPU when OpenCV was built with CUDA
+            self.use_cuda = hasattr(cv2, 'cuda') and cv2.cuda.getCudaEnabledDeviceCount() > 0
+            if self.use_cuda:
+                self.gpu_frame = cv2.cuda_GpuMat()
+                self.gpu_blur = cv2.cuda.createGaussianFilter(cv2.CV_8UC1, cv2.CV_8UC1, (5, 5), 0)
+                self.gpu_canny = cv2.cuda.createCannyEdgeDetector(
+                    self.canny_params['threshold1'], self.canny_params['threshold2']
+                )
+                self.gpu_dilate = cv2.cuda.createMorphologyFilter(cv2.MORPH_DILATE, cv2.CV_8UC1, self.dilate_kernel)
+                self.gpu_open = cv2.cuda.createMorphologyFilter(cv2.MORPH_OPEN, cv2.CV_8UC1, self.motion_kernel)
+                self.gpu_bg_subtractor = cv2.cuda.createBackgroundSubtractorMOG2()
+                logger.info("CUDA device found, using GPU filter chain")
+            
+            # Otherwise offload the filter chain to OpenCL through UMat if the process
+            # allows it; the global switch belongs to the app, not to each instance
+            self.use_opencl = not self.use_cuda and cv2.ocl.useOpenCL()
+            
+            # Face detection runs on a downscaled frame; boxes are mapped back.
+            # Sizes are in downscaled pixels, capped at 400 px faces in the frame
+            self.face_detection_scale = 0.5
+            self.face_min_size = (20, 20)
+            self.face_max_size = (int(400 * self.face_detection_scale),) * 2
+            
+            # Faces and corners change slowly between frames, so they are only
+            # re-detected every detection_interval frames and reused otherwise
+            self.detection_interval = 3
+            self.frame_counter = 0
+            self.cached_faces = []
+            self.cached_corners = []
+            
             logger.info("Advanced video processor initialized successfully")
         except Exception as e:
             logger.error(f"Error initializing models: {e}")
     
-    def detect_faces_advanced(self, frame: np.ndarray) -> List[Dict]:
+    def detect_faces_advanced(self, frame: np.ndarray, gray: Optional[np.ndarray] = None) -> List[Dict]:
         """Advanced face detection with additional features"""
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = self.face_cascade.detectMultiScale(gray, 1.1, 4)
+        if gray is None:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        
+        # Scan a smaller image; the cascade builds its own pyramid, so this
+        # only skips its largest and most expensive levels
+        scale = self.face_detection_scale
+        small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        faces = self.face_cascade.detectMultiScale(
+            small, 1.1, 4, minSize=self.face_min_size, maxSize=self.face_max_size
+        )
+        
+        boxes = [[int(v / scale) for v in face] for face in faces]
+        face_rois = [gray[y:y+h, x:x+w] for (x, y, w, h) in boxes]
+        
+        # A cascade instance can't be shared between threads, so eyes and
+        # smiles run as two parallel streams that each scan every face ROI
+        smiles_future = self.thread_pool.submit(
+            self._count_detections, self.smile_cascade, face_rois, 1.8, 20
+        )
+        eye_counts = self._count_detections(self.eye_cascade, face_rois)
+        smile_counts = smiles_future.result()
         
         face_data = []
-        for (x, y, w, h) in faces:
-            face_roi = gray[y:y+h, x:x+w]
-            color_roi = frame[y:y+h, x:x+w]
-            
-            # Detect eyes within face
-            eyes = self.eye_cascade.detectMultiScale(face_roi)
-            
-            # Detect smile
-            smiles = self.smile_cascade.detectMultiScale(face_roi, 1.8, 20)
-            
+        for (x, y, w, h), eyes_count, smiles_count in zip(boxes, eye_counts, smile_counts):
             face_info = {
                 'bbox': [x, y, w, h],
-                'eyes_count': len(eyes),
-                'smile_detected': len(smiles) > 0,
+                'eyes_count': eyes_count,
+                'smile_detected': smiles_count > 0,
                 'area': w * h,
                 'aspect_ratio': w / h
             }
@@ -74,119 +213,229 @@ class AdvancedVideoProcessor:
         
         return face_data
     
-    def detect_motion_advanced(self, frame: np.ndarray) -> Dict:
+    def _count_detections(self, cascade, rois: List[np.ndarray], *args) -> List[int]:
+        """Run a cascade over each ROI and return the detection counts"""
+        return [len(cascade.detectMultiScale(roi, *args)) for roi in rois]
+    
+    def detect_motion_advanced(self, frame: np.ndarray, fg_mask: Optional[np.ndarray] = None,
+                               gray: Optional[np.ndarray] = None) -> Dict:
         """Advanced motion detection with tracking"""
-        fg_mask = self.bg_subtractor.apply(frame)
-        
-        # Noise reduction
-        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
-        fg_mask = cv2.morphologyEx(fg_mask, cv2.MORPH_OPEN, kernel)
+        if fg_mask is None and self.motion_method == 'running_average':
+            if gray is None:
+                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            fg_mask = self._running_average_foreground(gray)
+        
+        if fg_mask is None:
+            # Write into the bound mask buffer when the frame matches its shape
+            use_buffer = isinstance(frame, np.ndarray) and frame.shape == self.frame_shape
+            fg_mask = self.bg_subtractor.apply(frame, fgmask=self.mask_buffer if use_buffer else None)
+            
+            # Noise reduction
+            cv2.morphologyEx(fg_mask, cv2.MORPH_OPEN, self.motion_kernel, dst=fg_mask)
+            if isinstance(fg_mask, cv2.UMat):
+                fg_mask = fg_mask.get()
         
-        # Find contours
-        contours, _ = cv2.findContours(fg_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        # Label blobs; stats rows are (x, y, w, h, area), row 0 is background
+        _, _, stats, centroids = cv2.connectedComponentsWithStats(fg_mask, connectivity=8)
         
-        motion_objects = []
-        total_motion_area = 0
+        keep = stats[1:, cv2.CC_STAT_AREA] > 500  # Filter small noise
+        kept_stats = stats[1:][keep].tolist()
+        kept_centroids = centroids[1:][keep].astype(np.int32).tolist()
         
-        for contour in contours:
-            area = cv2.contourArea(contour)
-            if area > 500:  # Filter small noise
-                x, y, w, h = cv2.boundingRect(contour)
-                motion_objects.append({
-                    'bbox': [x, y, w, h],
-                    'area': area,
-                    'centroid': [x + w//2, y + h//2]
-                })
-                total_motion_area += area
+        motion_objects = [
+            {
+                'bbox': [x, y, w, h],
+                'area': area,
+                'centroid': centroid
+            }
+            for (x, y, w, h, area), centroid in zip(kept_stats, kept_centroids)
+        ]
+        total_motion_area = sum(obj['area'] for obj in motion_objects)
         
         return {
             'objects': motion_objects,
             'total_area': total_motion_area,
-            'motion_intensity': total_motion_area / (frame.shape[0] * frame.shape[1])
+            'motion_intensity': total_motion_area / (fg_mask.shape[0] * fg_mask.shape[1])
         }
     
-    def detect_edges_advanced(self, frame: np.ndarray) -> np.ndarray:
+    def _running_average_foreground(self, gray: np.ndarray) -> np.ndarray:
+        """Foreground mask from a running-mean background model"""
+        if self.background_model is None or self.background_model.shape != gray.shape:
+            self.background_model = gray.astype(np.float32)
+            self.motion_mask = np.zeros_like(gray)
+        
+        if NUMBA_AVAILABLE:
+            # Update, difference and threshold fused into one pass
+            _running_average_mask(gray, self.background_model, np.float32(self.background_learning_rate),
+                                  np.float32(self.background_threshold), self.motion_mask)
+        else:
+            diff = cv2.absdiff(gray, cv2.convertScaleAbs(self.background_model))
+            cv2.threshold(diff, self.background_threshold, 255, cv2.THRESH_BINARY, dst=self.motion_mask)
+            cv2.accumulateWeighted(gray, self.background_model, self.background_learning_rate)
+        
+        return self.motion_mask
+    
+    def detect_edges_advanced(self, frame: np.ndarray, gray: Optional[np.ndarray] = None,
+                              blurred: Optional[np.ndarray] = None,
+                              edges: Optional[np.ndarray] = None) -> np.ndarray:
         """Advanced edge detection with multiple methods"""
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if gray is None:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         
         # Gaussian blur to reduce noise
-        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+        blurred = cv2.GaussianBlur(gray, (5, 5), 0, dst=blurred)
         
         # Canny edge detection
-        edges = cv2.Canny(blurred, self.canny_params['threshold1'], self.canny_params['threshold2'])
+        edges = cv2.Canny(blurred, self.canny_params['threshold1'], self.canny_params['threshold2'], edges=edges)
         
         # Dilate edges to make them more visible
-        kernel = np.ones((2, 2), np.uint8)
-        edges = cv2.dilate(edges, kernel, iterations=1)
+        edges = cv2.dilate(edges, self.dilate_kernel, dst=edges, iterations=1)
         
         return edges
     
-    def detect_corners(self, frame: np.ndarray) -> List[Tuple[int, int]]:
+    def _run_cuda_filters(self, frame: np.ndarray) -> Tuple[np.ndarray, int, np.ndarray]:
+        """Run gray, edge and motion filters on the GPU with a single upload"""
+        self.gpu_frame.upload(frame)
+        gpu_gray = cv2.cuda.cvtColor(self.gpu_frame, cv2.COLOR_BGR2GRAY)
+        
+        # Edges never leave the device, only their pixel count does
+        gpu_edges = self.gpu_canny.detect(self.gpu_blur.apply(gpu_gray))
+        edge_pixels = cv2.cuda.countNonZero(self.gpu_dilate.apply(gpu_edges))
+        
+        fg_mask = None
+        if self.motion_method == 'mog2':
+            gpu_mask = self.gpu_bg_subtractor.apply(self.gpu_frame, -1, cv2.cuda.Stream_Null())
+            fg_mask = self.gpu_open.apply(gpu_mask).download()
+        
+        return gpu_gray.download(), edge_pixels, fg_mask
+    
+    def detect_corners(self, frame: np.ndarray, gray: Optional[np.ndarray] = None) -> List[Tuple[int, int]]:
         """Detect corner features in the frame"""
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        
-        corners = cv2.goodFeaturesToTrack(
-            gray,
-            maxCorners=100,
-            qualityLevel=0.01,
-            minDistance=10,
-            blockSize=3
-        )
+        if gray is None:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         
-        corner_points = []
-        if corners is not None:
-            corners = corners.reshape(-1, 2).astype(int)
-            for corner in corners:
-                x, y = corner
-                corner_points.append((int(x), int(y)))
+        keypoints = self.corner_detector.detect(gray, None)
+        if not keypoints:
+            return []
+        
+        # Keep the 100 strongest responses, converting coordinates in one cast
+        points = cv2.KeyPoint_convert(keypoints)
+        responses = np.fromiter((kp.response for kp in keypoints), np.float32, len(keypoints))
+        strongest = np.argsort(-responses)[:100]
+        corner_points = list(map(tuple, points[strongest].astype(np.int32).tolist()))
         
         return corner_points
     
-    def analyze_color_histogram(self, frame: np.ndarray) -> Dict:
+    def analyze_color_histogram(self, frame: np.ndarray, gray: Optional[np.ndarray] = None) -> Dict:
         """Analyze color distribution in the frame"""
-        # Calculate histograms for each channel
-        hist_b = cv2.calcHist([frame], [0], None, [256], [0, 256])
-        hist_g = cv2.calcHist([frame], [1], None, [256], [0, 256])
-        hist_r = cv2.calcHist([frame], [2], None, [256], [0, 256])
-        
-        # Calculate dominant colors
-        dominant_b = np.argmax(hist_b)
-        dominant_g = np.argmax(hist_g)
-        dominant_r = np.argmax(hist_r)
+        if gray is None:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         
-        # Calculate mean colors
-        mean_b = np.mean(frame[:, :, 0])
-        mean_g = np.mean(frame[:, :, 1])
-        mean_r = np.mean(frame[:, :, 2])
+        color_analysis = self._channel_color_stats(frame)
+        color_analysis['brightness'] = float(cv2.mean(gray)[0])
+        return color_analysis
+    
+    def _channel_color_stats(self, frame: np.ndarray) -> Dict:
+        """Dominant and mean BGR color of the frame, reported as RGB"""
+        # Calculate dominant colors, reusing one histogram buffer per channel.
+        # 32 bins are plenty for a dominant color; report each bin's center
+        bins = 32
+        bin_width = 256 // bins
+        hist = np.empty((bins, 1), np.float32)
+        dominant_b, dominant_g, dominant_r = [
+            np.argmax(cv2.calcHist([frame], [channel], None, [bins], [0, 256], hist=hist, accumulate=False))
+            * bin_width + bin_width // 2
+            for channel in range(3)
+        ]
+        
+        # Calculate mean colors in a single pass over all channels
+        mean_b, mean_g, mean_r, _ = cv2.mean(frame)
         
         return {
             'dominant_color': [int(dominant_r), int(dominant_g), int(dominant_b)],
-            'mean_color': [int(mean_r), int(mean_g), int(mean_b)],
-            'brightness': float(np.mean(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY).astype(np.float32)))
+            'mean_color': [int(mean_r), int(mean_g), int(mean_b)]
         }
     
+    def _gray_statistics(self, gray: np.ndarray, edges) -> Tuple[float, int]:
+        """Mean brightness and edge pixel count, fused into one pass with Numba"""
+        if NUMBA_AVAILABLE and isinstance(edges, np.ndarray):
+            brightness, edge_pixels = _gray_edge_stats(gray, edges)
+            return float(brightness), int(edge_pixels)
+        return cv2.mean(gray)[0], cv2.countNonZero(edges)
+    
+    def _bind_shape(self, shape: Tuple[int, ...]):
+        """Allocate the working buffers for a fixed input resolution"""
+        height, width = shape[:2]
+        self.frame_shape = shape
+        self.gray_buffer = np.empty((height, width), np.uint8)
+        self.blurred_buffer = np.empty((height, width), np.uint8)
+        self.edges_buffer = np.empty((height, width), np.uint8)
+        self.mask_buffer = np.empty((height, width), np.uint8)
+        self.annotation_buffer = np.empty(shape, np.uint8)
+        logger.info(f"Bound analysis buffers to {width}x{height}")
+    
     def comprehensive_analysis(self, frame: np.ndarray) -> Dict:
         """Perform comprehensive video analysis"""
+        with self.analysis_lock:
+            return self._analyze_frame(frame)
+    
+    def _analyze_frame(self, frame: np.ndarray) -> Dict:
+        """Analyze one frame; callers must hold analysis_lock"""
         start_time = time.time()
         
-        # Basic frame info
-        height, width = frame.shape[:2]
+        # Streams keep a fixed resolution, so buffers are only rebound when it changes
+        if frame.shape != self.frame_shape:
+            self._bind_shape(frame.shape)
+        height, width = self.frame_shape[:2]
+        
+        edge_buffers = (None, None)
+        if self.use_cuda:
+            gray, edge_pixels, fg_mask = self._run_cuda_filters(frame)
+            source = frame
+        elif self.use_opencl:
+            # With OpenCL the motion and edge filter chains stay on the device;
+            # only the gray image needed for NumPy indexing is downloaded
+            source = cv2.UMat(frame)
+            device_gray = cv2.cvtColor(source, cv2.COLOR_BGR2GRAY)
+            gray = device_gray.get()
+            fg_mask = None
+        else:
+            # Shared grayscale conversion, reused by every detector below
+            source = frame
+            gray = device_gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self.gray_buffer)
+            edge_buffers = (self.blurred_buffer, self.edges_buffer)
+            fg_mask = None
+        
+        run_detectors = self.frame_counter % self.detection_interval == 0
+        self.frame_counter += 1
+        
+        # Corner, color and edge analysis run concurrently in the pool
+        corners_future = self.thread_pool.submit(self.detect_corners, frame, gray) if run_detectors else None
+        color_future = self.thread_pool.submit(self._channel_color_stats, frame)
+        edges_future = None
+        if not self.use_cuda:
+            edges_future = self.thread_pool.submit(self.detect_edges_advanced, frame, device_gray, *edge_buffers)
         
         # Face detection
-        faces = self.detect_faces_advanced(frame)
-        
-        # Motion detection
-        motion_data = self.detect_motion_advanced(frame)
-        
-        # Corner detection
-        corners = self.detect_corners(frame)
-        
-        # Color analysis
-        color_analysis = self.analyze_color_histogram(frame)
-        
-        # Edge detection
-        edges = self.detect_edges_advanced(frame)
-        edge_density = np.sum(edges > 0) / (height * width)
+        if run_detectors:
+            self.cached_faces = self.detect_faces_advanced(frame, gray=gray)
+        faces = self.cached_faces
+        
+        # Motion detection (kept on this thread, the subtractor is stateful)
+        motion_data = self.detect_motion_advanced(source, fg_mask=fg_mask, gray=gray)
+        
+        if corners_future is not None:
+            self.cached_corners = corners_future.result()
+        corners = self.cached_corners
+        color_analysis = color_future.result()
+        
+        # Brightness and edge density come from one scan of the gray frame
+        if edges_future is not None:
+            brightness, edge_pixels = self._gray_statistics(gray, edges_future.result())
+        else:
+            brightness = cv2.mean(gray)[0]
+        color_analysis['brightness'] = float(brightness)
+        edge_density = edge_pixels / (height * width)
         
         processing_time = time.time() - start_time
         
@@ -210,35 +459,24 @@ class AdvancedVideoProcessor:
     
     def calculate_quality_score(self, faces: List[Dict], motion_data: Dict, edge_density: float) -> float:
         """Calculate a quality score for the frame"""
-        score = 0.0
-        
-        # Face quality (0-40 points)
-        if faces:
-            face_score = min(len(faces) * 10, 40)
-            # Bonus for well-sized faces
-            for face in faces:
-                if 50 < face['area'] < 10000:  # Good face size
-                    face_score += 5
-            score += min(face_score, 40)
-        
-        # Motion quality (0-30 points)
-        motion_intensity = motion_data.get('motion_intensity', 0)
-        if 0.01 < motion_intensity < 0.3:  # Good amount of motion
-            score += 30
-        elif motion_intensity > 0:
-            score += 15
-        
-        # Edge quality (0-30 points)
-        if 0.1 < edge_density < 0.4:  # Good amount of detail
-            score += 30
-        elif edge_density > 0:
-            score += 15
-        
-        return min(score, 100.0)
+        face_areas = np.fromiter((face['area'] for face in faces), dtype=np.int64, count=len(faces))
+        motion_intensity = float(motion_data.get('motion_intensity', 0))
+        
+        return float(_quality_kernel(len(faces), face_areas, motion_intensity, float(edge_density)))
     
-    def draw_comprehensive_annotations(self, frame: np.ndarray, analysis_result: Dict) -> np.ndarray:
+    def draw_comprehensive_annotations(self, frame: np.ndarray, analysis_result: Dict,
+                                       inplace: bool = False) -> np.ndarray:
         """Draw comprehensive annotations on the frame"""
-        annotated_frame = frame.copy()
+        if inplace:
+            annotated_frame = frame
+        else:
+            # Reuse one output buffer instead of allocating a copy per frame;
+            # the result is overwritten by the next call
+            if (self.annotation_buffer is None or self.annotation_buffer.shape != frame.shape
+                    or self.annotation_buffer.dtype != frame.dtype):
+                self.annotation_buffer = np.empty_like(frame)
+            np.copyto(self.annotation_buffer, frame)
+            annotated_frame = self.annotation_buffer
         
         # Draw faces
         for face in analysis_result.get('faces', []):
@@ -252,15 +490,22 @@ class AdvancedVideoProcessor:
                 info += " | Smile"
             cv2.putText(annotated_frame, info, (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
         
-        # Draw motion objects
-        for motion_obj in analysis_result.get('motion', {}).get('objects', []):
-            x, y, w, h = motion_obj['bbox']
-            cv2.rectangle(annotated_frame, (x, y), (x+w, y+h), (0, 255, 255), 2)
-            cv2.putText(annotated_frame, 'Motion', (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
-        
-        # Draw corners
-        for corner in analysis_result.get('corners', []):
-            cv2.circle(annotated_frame, corner, 3, (255, 255, 0), -1)
+        # Draw motion objects, all rectangles in a single polylines call
+        motion_objects = analysis_result.get('motion', {}).get('objects', [])
+        if motion_objects:
+            boxes = np.array([motion_obj['bbox'] for motion_obj in motion_objects], np.int32)
+            x, y, w, h = boxes.T
+            rectangles = np.stack([x, y, x + w, y, x + w, y + h, x, y + h], axis=1).reshape(-1, 4, 2)
+            cv2.polylines(annotated_frame, rectangles, True, (0, 255, 255), 2)
+            for x, y in boxes[:, :2].tolist():
+                cv2.putText(annotated_frame, 'Motion', (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
+        
+        # Draw corners; a one-point closed polyline renders as a filled dot
+        # of radius thickness / 2, so every corner is drawn in one call
+        corners = analysis_result.get('corners', [])
+        if corners:
+            points = np.array(corners, np.int32).reshape(-1, 1, 2)
+            cv2.polylines(annotated_frame, points, True, (255, 255, 0), 6)
         
         # Draw quality score
         quality_score = analysis_result.get('quality_score', 0)
@@ -275,20 +520,114 @@ class AdvancedVideoProcessor:
         
         return annotated_frame
     
+    def process_video_threaded(self, source, sink: Optional[str] = None, prefetch: int = 8) -> Dict:
+        """Analyze a video with overlapping read, analysis and write stages"""
+        # Reader and writer run on their own threads; analysis stays on the
+        # calling thread so the background subtractor is never shared
+        cap = cv2.VideoCapture(source)
+        if not cap.isOpened():
+            logger.error(f"Cannot open video source: {source}")
+            return self.get_analytics_summary()
+        
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        read_q = queue.Queue(maxsize=prefetch)
+        write_q = queue.Queue(maxsize=prefetch)
+        stop_event = threading.Event()
+        
+        def put(q, item):
+            # Bounded put that gives up once the pipeline is shutting down
+            while not stop_event.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def reader():
+            try:
+                while not stop_event.is_set():
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+                    if not put(read_q, frame):
+                        return
+            except Exception as e:
+                logger.error(f"Video reader failed: {e}")
+            put(read_q, None)
+        
+        def writer():
+            out = None
+            try:
+                while True:
+                    annotated = write_q.get()
+                    if annotated is None:
+                        break
+                    if out is None:
+                        h, w = annotated.shape[:2]
+                        out = cv2.VideoWriter(sink, cv2.VideoWriter_fourcc(*'mp4v'), fps, (w, h))
+                    out.write(annotated)
+            except Exception as e:
+                logger.error(f"Video writer failed: {e}")
+                stop_event.set()
+            finally:
+                if out is not None:
+                    out.release()
+        
+        reader_thread = threading.Thread(target=reader, daemon=True)
+        writer_thread = threading.Thread(target=writer, daemon=True) if sink else None
+        reader_thread.start()
+        if writer_thread:
+            writer_thread.start()
+        
+        try:
+            while True:
+                # Poll so a failed writer, which stops the reader before it can
+                # queue the end marker, can't leave this waiting on a live source
+                try:
+                    frame = read_q.get(timeout=0.1)
+                except queue.Empty:
+                    if stop_event.is_set():
+                        break
+                    continue
+                if frame is None:
+                    break
+                
+                analysis_result = self.comprehensive_analysis(frame)
+                
+                if writer_thread:
+                    # The decoded frame is owned by this pipeline, so annotate
+                    # it directly rather than through the shared buffer
+                    annotated_frame = self.draw_comprehensive_annotations(frame, analysis_result, inplace=True)
+                    if not put(write_q, annotated_frame):
+                        break
+        finally:
+            if writer_thread:
+                put(write_q, None)
+            stop_event.set()
+            reader_thread.join()
+            if writer_thread:
+                writer_thread.join()
+            cap.release()
+        
+        return self.get_analytics_summary()
+    
     def update_metrics(self, analysis_result: Dict):
         """Update processing metrics"""
         self.metrics['total_frames'] += 1
         self.metrics['faces_detected'] += len(analysis_result.get('faces', []))
         self.metrics['objects_detected'] += len(analysis_result.get('motion', {}).get('objects', []))
-        self.metrics['processing_times'].append(analysis_result.get('processing_time', 0))
         
-        # Keep only last 100 processing times
-        if len(self.metrics['processing_times']) > 100:
-            self.metrics['processing_times'] = self.metrics['processing_times'][-100:]
+        # Overwrite the oldest slot once the last 100 processing times are held
+        window = len(self.processing_times)
+        self.processing_times[self.processing_times_index] = analysis_result.get('processing_time', 0)
+        self.processing_times_index = (self.processing_times_index + 1) % window
+        self.processing_times_count = min(self.processing_times_count + 1, window)
     
     def get_analytics_summary(self) -> Dict:
         """Get comprehensive analytics summary"""
-        avg_processing_time = np.mean(self.metrics['processing_times']) if self.metrics['processing_times'] else 0
+        count = self.processing_times_count
+        avg_processing_time = float(self.processing_times[:count].mean()) if count else 0
         
         return {
             'total_frames_processed': self.metrics['total_frames'],
@@ -305,6 +644,10 @@ class AdvancedVideoProcessor:
         self.metrics = {
             'total_frames': 0,
             'objects_detected': 0,
-            'faces_detected': 0,
-            'processing_times': []
+            'faces_detected': 0
         }
+        
+        # Fixed-size ring buffer of the most recent processing times
+        self.processing_times = np.zeros(100, np.float64)
+        self.processing_times_index = 0
+        self.processing_times_count = 0
@@ -6,14 +6,14 @@ import threading
 import queue
 import time
 import json
+import csv
+import gzip
+import io
+from collections import deque
+from typing import Optional
 import os
 import sys
 from datetime import datetime
-import base64
-import io
-from PIL import Image
-import boto3
-from botocore.exceptions import ClientError
 import logging
 from dotenv import load_dotenv
 
@@ -28,6 +28,36 @@ except ImportError:
     ADVANCED_PROCESSOR_AVAILABLE = False
     logging.warning("Advanced processor not available")
 
+# Fused Numba kernels for the edge filter (no-ops without numba)
+from edge_utils import NUMBA_AVAILABLE, bgr_to_gray_u8, gray_to_bgr_inplace
+from image_ops import apply_bcs
+
+# Faster JSON encoding when orjson is installed
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Binary MessagePack exports; prefer the Rust-based ormsgpack
+try:
+    import ormsgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    ormsgpack = None
+    try:
+        import msgpack
+        MSGPACK_AVAILABLE = True
+    except ImportError:
+        MSGPACK_AVAILABLE = False
+
+# Typed encoders for the fixed-shape /health and /export responses
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -35,23 +65,92 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app)
 
+if ORJSON_AVAILABLE:
+    from flask.json.provider import DefaultJSONProvider
+    
+    class ORJSONProvider(DefaultJSONProvider):
+        """Flask JSON provider backed by orjson, used by jsonify and request.get_json"""
+        
+        def dumps(self, obj, **kwargs):
+            option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+        
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+    
+    app.json = ORJSONProvider(app)
+
+if MSGSPEC_AVAILABLE:
+    class HealthResponse(msgspec.Struct, omit_defaults=True):
+        """Body of /health; unset fields are left out of the JSON"""
+        status: str
+        timestamp: str
+        service: Optional[str] = None
+        version: Optional[str] = None
+        video_processor: Optional[dict] = None
+        aws_s3: Optional[str] = None
+        error: Optional[str] = None
+    
+    class ExportResponse(msgspec.Struct):
+        """Body of a successful /api/export_data call"""
+        success: bool
+        message: str
+        filepath: str
+        format: str
+    
+    _msgspec_encoder = msgspec.json.Encoder()
+else:
+    HealthResponse = ExportResponse = None
+
+def struct_response(struct_type, payload):
+    """JSON response for a fixed-shape payload, encoded via its msgspec struct when available"""
+    if struct_type is None:
+        return jsonify(payload)
+    return Response(_msgspec_encoder.encode(struct_type(**payload)), mimetype='application/json')
+
+def dumps_json(data, indent=False):
+    """Serialize data to UTF-8 JSON bytes, using orjson when available"""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(data, option=option)
+    return json.dumps(data, indent=2 if indent else None, default=_json_default).encode('utf-8')
+
+def dumps_msgpack(data):
+    """Serialize data to MessagePack bytes, using ormsgpack when available"""
+    if ormsgpack is not None:
+        return ormsgpack.packb(data, option=ormsgpack.OPT_SERIALIZE_NUMPY)
+    return msgpack.packb(data, use_bin_type=True, default=_json_default)
+
+def round_floats(obj, ndigits=4):
+    """Recursively round floats in dicts, lists and numpy arrays to shrink exported payloads"""
+    if isinstance(obj, (float, np.floating)):
+        return round(float(obj), ndigits)
+    if isinstance(obj, dict):
+        return {key: round_floats(value, ndigits) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [round_floats(value, ndigits) for value in obj]
+    if isinstance(obj, np.ndarray) and np.issubdtype(obj.dtype, np.floating):
+        return np.round(obj, ndigits).tolist()
+    return obj
+
+def _json_default(obj):
+    """Convert numpy values for the stdlib encoder, as OPT_SERIALIZE_NUMPY does"""
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
 class VideoProcessor:
     def __init__(self):
         self.cap = None
         self.processing_enabled = False
         
-        # Initialize advanced processor if available
-        if ADVANCED_PROCESSOR_AVAILABLE:
-            self.advanced_processor = AdvancedVideoProcessor()
-            logger.info("Advanced video processor initialized")
-        else:
-            self.advanced_processor = None
-            
         # Basic cascades for fallback - with proper error handling
         try:
             # Try new OpenCV path first
             cascade_path = cv2.data.haarcascades if hasattr(cv2, 'data') else cv2.__file__.replace('__init__.py', 'data/')
-            self.face_cascade = cv2.CascadeClassifier(cascade_path + 'haarcascade_frontalface_default.xml')
+            self.face_cascade = self.load_face_cascade(cascade_path)
             self.eye_cascade = cv2.CascadeClassifier(cascade_path + 'haarcascade_eye.xml')
             self.body_cascade = cv2.CascadeClassifier(cascade_path + 'haarcascade_fullbody.xml')
         except Exception as e:
@@ -60,6 +159,31 @@ class VideoProcessor:
             self.eye_cascade = None
             self.body_cascade = None
         
+        # Faces are detected at half resolution; sizes are in downscaled pixels
+        # (60-400 px faces in the frame)
+        self.face_detection_scale = 0.5
+        self.face_min_size = (30, 30)
+        self.face_max_size = (200, 200)
+        
+        # Local contrast equalization recovers LBP accuracy in flat lighting
+        self.clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+        
+        # Run the cascades through OpenCL (T-API) via UMat, but only once a
+        # reference detection on the device matches the CPU result
+        try:
+            self.use_opencl = self.verify_opencl()
+            cv2.ocl.setUseOpenCL(self.use_opencl)
+        except Exception as e:
+            logger.warning(f"OpenCL unavailable, face detection stays on the CPU: {e}")
+            self.use_opencl = False
+        
+        # Created after the OpenCL decision, which the advanced processor follows
+        if ADVANCED_PROCESSOR_AVAILABLE:
+            self.advanced_processor = AdvancedVideoProcessor()
+            logger.info("Advanced video processor initialized")
+        else:
+            self.advanced_processor = None
+        
         # Video processing options
         self.processing_options = {
             'face_detection': False,
@@ -75,8 +199,52 @@ class VideoProcessor:
         }
         
         # Motion detection variables
-        self.background_subtractor = cv2.createBackgroundSubtractorMOG2()
+        # Shadow detection roughly doubles per-pixel work and isn't used here
+        self.background_subtractor = cv2.createBackgroundSubtractorMOG2(history=200, detectShadows=False)
         self.motion_threshold = 500
+        self.motion_kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+        
+        # Reusable filter output buffers by name, see _buf
+        self._bufs = {}
+        self._frame_gray = None
+        
+        # Streaming JPEG state; quality adapts to the measured encode time
+        self.frame_id = 0
+        self.jpeg_quality = 85
+        self._encoded_frame = None
+        self._encoded_frame_id = -1
+        self._encode_times = deque(maxlen=30)
+        
+        # Capture thread and the MJPEG clients it publishes to
+        self._capture_stop = threading.Event()
+        self._capture_thread = None
+        self._latest_frame = None
+        self._frame_lock = threading.Lock()
+        
+        # Unprocessed frames are only copied when a route asks for one
+        self._raw_requested = False
+        self._raw_ready = threading.Event()
+        self._raw_request_lock = threading.Lock()
+        self._last_raw = None
+        self._stream_clients = []
+        self._stream_clients_lock = threading.Lock()
+        
+        # Rendered overlay text tiles, keyed by overlay slot
+        self._overlay_cache = {}
+        
+        # Advanced analysis sampling; the interval adapts to its measured cost
+        self._adv_interval = 5
+        self._adv_budget_ms = 20
+        # Counted separately from stats so /api/reset_stats can't stall the sampler
+        self.last_analysis = None
+        self._frames_since_analysis = 0
+        
+        # Face detection worker; it always takes the most recent frame
+        self._detection_queue = queue.Queue(maxsize=1)
+        self._detection_stop = threading.Event()
+        self._detection_thread = None
+        self._latest_frame_lock = threading.Lock()
+        self._latest_detections = []
         
         # Object tracking variables
         self.tracker = None
@@ -90,17 +258,92 @@ class VideoProcessor:
             'processing_time': 0,
             'start_time': time.time(),
             'advanced_analysis_count': 0,
-            'quality_scores': []
+            'quality_scores': deque(maxlen=100)  # Only the last 100 are kept
         }
         
         # AWS S3 for cloud storage
+        self._boto3 = None
         self.s3_client = None
         self.kinesis_client = None
         self.initialize_aws()
         
+        # Analysis records are batched to Kinesis off the render thread. The
+        # flusher starts on first use in the process that sends, since threads
+        # don't survive the fork into a preloaded gunicorn worker
+        self._kinesis_queue = None
+        self._kinesis_thread = None
+        self._kinesis_pid = None
+        self._kinesis_start_lock = threading.Lock()
+        
+    def _get_boto3(self):
+        """Import boto3 on first use; it is slow to import and only needed for AWS"""
+        if self._boto3 is None:
+            import boto3
+            self._boto3 = boto3
+        return self._boto3
+    
+    def load_face_cascade(self, cascade_path):
+        """Load the LBP frontal face cascade, falling back to the slower Haar one"""
+        # pip builds of OpenCV only ship Haar cascades; download_models.py
+        # fetches the LBP cascade into models/lbpcascades
+        for lbp_path in (os.path.join(cascade_path, 'lbpcascade_frontalface_improved.xml'),
+                         os.path.join('models', 'lbpcascades', 'lbpcascade_frontalface_improved.xml')):
+            if os.path.exists(lbp_path):
+                cascade = cv2.CascadeClassifier(lbp_path)
+                if not cascade.empty():
+                    logger.info(f"Using LBP face cascade: {lbp_path}")
+                    return cascade
+        
+        logger.info("LBP face cascade not found, using Haar cascade")
+        return cv2.CascadeClassifier(cascade_path + 'haarcascade_frontalface_default.xml')
+    
+    def verify_opencl(self):
+        """Return True when OpenCL face detection matches the CPU path on a reference frame"""
+        if self.face_cascade is None or not cv2.ocl.haveOpenCL():
+            return False
+        
+        # Seeded texture with a few face-sized blobs, identical on every start
+        rng = np.random.default_rng(0)
+        reference = cv2.GaussianBlur(rng.integers(0, 256, (480, 640, 3), dtype=np.uint8), (0, 0), 3)
+        for center in ((160, 200), (320, 240), (480, 260)):
+            cv2.ellipse(reference, center, (50, 65), 0, 0, 360, (200, 180, 170), -1)
+            cv2.circle(reference, (center[0] - 18, center[1] - 15), 7, (40, 40, 40), -1)
+            cv2.circle(reference, (center[0] + 18, center[1] - 15), 7, (40, 40, 40), -1)
+        
+        results = {}
+        for use_opencl in (False, True):
+            self.use_opencl = use_opencl
+            _, small = self._prepare_face_gray(reference)
+            try:
+                faces = self.find_faces(reference)
+            except cv2.error as e:
+                logger.warning(f"OpenCL reference detection failed, using the CPU: {e}")
+                return False
+            if use_opencl and not self.use_opencl:
+                return False  # find_faces hit a cv2.error and fell back
+            results[use_opencl] = (small.get() if isinstance(small, cv2.UMat) else small, faces)
+        
+        (cpu_small, cpu_faces), (ocl_small, ocl_faces) = results[False], results[True]
+        # Kernels may round differently by a gray level; boxes must match exactly
+        pixel_diff = int(cv2.absdiff(cpu_small, ocl_small).max())
+        agree = pixel_diff <= 1 and cpu_faces == ocl_faces
+        if agree:
+            logger.info("OpenCL face detection verified against the CPU path")
+        else:
+            logger.warning(f"OpenCL face detection disagrees with the CPU path "
+                           f"(max pixel diff {pixel_diff}, {len(ocl_faces)} vs {len(cpu_faces)} faces), using the CPU")
+        return agree
+    
     def initialize_aws(self):
         """Initialize AWS clients"""
+        # Without credentials there is nothing to connect to, so skip boto3 entirely
+        if not os.getenv('AWS_ACCESS_KEY_ID'):
+            logger.info("AWS credentials not set, cloud features disabled")
+            return
+        
         try:
+            boto3 = self._get_boto3()
+            
             # S3 client
             self.s3_client = boto3.client(
                 's3',
@@ -125,12 +368,32 @@ class VideoProcessor:
         """Start camera capture"""
         try:
             self.cap = cv2.VideoCapture(camera_index)
-            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-            self.cap.set(cv2.CAP_PROP_FPS, 30)
+            
+            # Ask for MJPEG before the size so the camera compresses on-device
+            # instead of streaming raw YUYV, and capture at the processing size
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, int(os.getenv('CAMERA_WIDTH', 960)))
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, int(os.getenv('CAMERA_HEIGHT', 540)))
+            self.cap.set(cv2.CAP_PROP_FPS, int(os.getenv('CAMERA_FPS', 30)))
+            
+            # Keep only the newest frame queued in the driver to avoid stale frames
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
             
             if not self.cap.isOpened():
                 raise Exception("Cannot open camera")
+            
+            # Face detection runs beside the capture loop so a slow cascade
+            # doesn't hold back streaming
+            if self._detection_thread is None or not self._detection_thread.is_alive():
+                self._detection_stop.clear()
+                self._detection_thread = threading.Thread(target=self._detection_worker, daemon=True)
+                self._detection_thread.start()
+            
+            # Frames are captured on their own thread and pushed to stream clients
+            if self._capture_thread is None or not self._capture_thread.is_alive():
+                self._capture_stop.clear()
+                self._capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
+                self._capture_thread.start()
                 
             logger.info(f"Camera {camera_index} started successfully")
             return True
@@ -140,6 +403,18 @@ class VideoProcessor:
     
     def stop_camera(self):
         """Stop camera capture"""
+        if self._capture_thread is not None:
+            self._capture_stop.set()
+            self._capture_thread.join()
+            self._capture_thread = None
+            self._latest_frame = None
+        
+        if self._detection_thread is not None:
+            self._detection_stop.set()
+            self._detection_thread.join()
+            self._detection_thread = None
+            self._latest_detections = []
+        
         if self.cap:
             self.cap.release()
             self.cap = None
@@ -148,34 +423,80 @@ class VideoProcessor:
     def process_frame(self, frame):
         """Apply various processing filters to the frame"""
         start_time = time.time()
-        processed_frame = frame.copy()
-        
-        # Brightness and contrast adjustment
-        if self.processing_options['brightness'] != 0 or self.processing_options['contrast'] != 1.0:
-            processed_frame = cv2.convertScaleAbs(
-                processed_frame, 
-                alpha=self.processing_options['contrast'], 
-                beta=self.processing_options['brightness']
-            )
+        
+        # Only copy when a filter replaces or draws on the frame; a lone
+        # brightness/contrast/saturation adjustment is applied to the frame in place
+        needs_copy = any(
+            self.processing_options.get(option, False)
+            for option in ('grayscale', 'edge_detection', 'blur', 'face_detection',
+                           'motion_detection', 'object_tracking', 'advanced_analysis')
+        )
+        if needs_copy:
+            processed_frame = self._buf('frame', frame.shape, frame.dtype)
+            np.copyto(processed_frame, frame)
+        else:
+            processed_frame = frame
+        
+        # Gray version of processed_frame, shared by the filters below; any
+        # step that changes the frame resets or replaces it
+        self._frame_gray = None
+        
+        # Brightness, contrast and saturation adjustment
+        brightness = self.processing_options['brightness']
+        contrast = self.processing_options['contrast']
+        saturation = self.processing_options.get('saturation', 1.0)
+        if NUMBA_AVAILABLE and processed_frame.flags['C_CONTIGUOUS'] and (
+                brightness != 0 or contrast != 1.0 or saturation != 1.0):
+            # All three in one fused pass over the pixels
+            apply_bcs(processed_frame, np.float32(brightness), np.float32(contrast),
+                      np.float32(saturation), processed_frame)
+        else:
+            if saturation != 1.0:
+                # Blend each pixel with its gray value to scale the chroma
+                gray_bgr = cv2.cvtColor(cv2.cvtColor(processed_frame, cv2.COLOR_BGR2GRAY), cv2.COLOR_GRAY2BGR)
+                cv2.addWeighted(processed_frame, saturation, gray_bgr, 1.0 - saturation, 0, dst=processed_frame)
+            if brightness != 0 or contrast != 1.0:
+                cv2.convertScaleAbs(
+                    processed_frame, 
+                    dst=processed_frame,
+                    alpha=contrast, 
+                    beta=brightness
+                )
         
         # Grayscale conversion
         if self.processing_options['grayscale']:
-            processed_frame = cv2.cvtColor(processed_frame, cv2.COLOR_BGR2GRAY)
-            processed_frame = cv2.cvtColor(processed_frame, cv2.COLOR_GRAY2BGR)
+            cv2.cvtColor(self._get_gray(processed_frame), cv2.COLOR_GRAY2BGR, dst=processed_frame)
         
         # Blur effect
         if self.processing_options['blur']:
-            processed_frame = cv2.GaussianBlur(processed_frame, (15, 15), 0)
+            processed_frame = cv2.GaussianBlur(processed_frame, (15, 15), 0,
+                                               dst=self._buf('blur', processed_frame.shape, processed_frame.dtype))
+            self._frame_gray = None
         
         # Edge detection
         if self.processing_options['edge_detection']:
-            gray = cv2.cvtColor(processed_frame, cv2.COLOR_BGR2GRAY)
-            edges = cv2.Canny(gray, 100, 200)
-            processed_frame = cv2.cvtColor(edges, cv2.COLOR_GRAY2BGR)
+            # The edges are written back into the frame we already own
+            edges = cv2.Canny(self._get_gray(processed_frame), 100, 200,
+                              edges=self._buf('edges', processed_frame.shape[:2]))
+            if NUMBA_AVAILABLE and processed_frame.flags['C_CONTIGUOUS']:
+                gray_to_bgr_inplace(edges, processed_frame)
+            else:
+                cv2.cvtColor(edges, cv2.COLOR_GRAY2BGR, dst=processed_frame)
+            
+            # The frame is now the edge map on all channels, so that is its gray
+            self._frame_gray = edges
         
         # Face detection
         if self.processing_options['face_detection']:
-            self.detect_faces(processed_frame)
+            if self._detection_thread is not None and self._detection_thread.is_alive():
+                # The worker detects on its own copy of the gray frame; overlay
+                # its latest boxes
+                self.submit_for_detection(self._get_gray(processed_frame).copy())
+                with self._latest_frame_lock:
+                    detections = self._latest_detections
+                self.draw_faces(processed_frame, detections)
+            else:
+                self.detect_faces(processed_frame, gray=self._get_gray(processed_frame))
         
         # Motion detection
         if self.processing_options['motion_detection']:
@@ -188,29 +509,37 @@ class VideoProcessor:
         # Advanced analysis
         if self.processing_options.get('advanced_analysis', False) and self.advanced_processor:
             try:
-                # Get comprehensive analysis
-                analysis_result = self.advanced_processor.comprehensive_analysis(processed_frame)
+                # Analyze every _adv_interval frames; frames in between reuse the
+                # last result for their annotations
+                self._frames_since_analysis += 1
+                if self.last_analysis is None or self._frames_since_analysis >= self._adv_interval:
+                    # Get comprehensive analysis
+                    analysis_start = time.perf_counter()
+                    analysis_result = self.advanced_processor.comprehensive_analysis(processed_frame)
+                    analysis_ms = (time.perf_counter() - analysis_start) * 1000
+                    
+                    # Spread the analysis cost so it averages under the per-frame budget
+                    self._adv_interval = max(1, min(30, int(np.ceil(analysis_ms / self._adv_budget_ms))))
+                    self.last_analysis = analysis_result
+                    self._frames_since_analysis = 0
+                    
+                    # Update stats
+                    self.stats['advanced_analysis_count'] += 1
+                    if 'quality_scores' not in self.stats:
+                        self.stats['quality_scores'] = deque(maxlen=100)
+                    
+                    # The deque evicts the oldest score once it holds 100
+                    quality_score = analysis_result.get('quality_score', 0)
+                    self.stats['quality_scores'].append(quality_score)
+                    
+                    # Send to Kinesis
+                    self.send_to_kinesis(analysis_result)
                 
                 # Draw annotations
                 processed_frame = self.advanced_processor.draw_comprehensive_annotations(
-                    processed_frame, analysis_result
+                    processed_frame, self.last_analysis, inplace=True
                 )
                 
-                # Update stats
-                self.stats['advanced_analysis_count'] += 1
-                if 'quality_scores' not in self.stats:
-                    self.stats['quality_scores'] = []
-                
-                quality_score = analysis_result.get('quality_score', 0)
-                self.stats['quality_scores'].append(quality_score)
-                
-                # Keep only last 100 quality scores
-                if len(self.stats['quality_scores']) > 100:
-                    self.stats['quality_scores'] = self.stats['quality_scores'][-100:]
-                    
-                # Send to Kinesis
-                self.send_to_kinesis(analysis_result)
-                
             except Exception as e:
                 logger.error(f"Advanced analysis failed: {e}")
         
@@ -218,49 +547,154 @@ class VideoProcessor:
         processing_time = time.time() - start_time
         self.stats['frames_processed'] += 1
         self.stats['processing_time'] += processing_time
+        self._frame_gray = None
         
         return processed_frame
     
-    def detect_faces(self, frame):
+    def _get_gray(self, frame):
+        """Gray version of the frame being processed, converted at most once"""
+        if self._frame_gray is None:
+            gray = self._buf('gray', frame.shape[:2])
+            if NUMBA_AVAILABLE and frame.flags['C_CONTIGUOUS']:
+                # Fused single-pass luma
+                bgr_to_gray_u8(frame, gray)
+            else:
+                cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray)
+            self._frame_gray = gray
+        return self._frame_gray
+    
+    def _buf(self, name, shape, dtype=np.uint8):
+        """Reusable buffer for one pipeline stage, reallocated only when its shape changes"""
+        buf = self._bufs.get(name)
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = np.empty(shape, dtype)
+            self._bufs[name] = buf
+        return buf
+    
+    def detect_faces(self, frame, gray=None):
         """Detect and highlight faces in the frame"""
         if self.face_cascade is None:
             return  # Skip if cascade not loaded
-            
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = self.face_cascade.detectMultiScale(gray, 1.1, 4)
         
+        detections = self.find_faces(frame, gray=gray)
+        self.draw_faces(frame, detections)
+        self.stats['faces_detected'] += len(detections)
+    
+    def _prepare_face_gray(self, frame, gray=None):
+        """Return the equalized gray image and its downscaled copy for the face cascade"""
+        # With OpenCL the conversion and cascade run on the device; only the
+        # rectangles come back to the host
+        if gray is None:
+            source = cv2.UMat(frame) if self.use_opencl else frame
+            gray = cv2.cvtColor(source, cv2.COLOR_BGR2GRAY)
+        elif self.use_opencl:
+            gray = cv2.UMat(gray)
+        gray = self.clahe.apply(gray)
+        
+        # Scan a downscaled image and map the boxes back; the cascade cost
+        # scales with pixel count, and eyes still use full-resolution ROIs
+        scale = self.face_detection_scale
+        small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return gray, small
+    
+    def find_faces(self, frame, gray=None):
+        """Return (face_box, eye_boxes) pairs found in the frame or its gray image"""
+        gray, small = self._prepare_face_gray(frame, gray)
+        scale = self.face_detection_scale
+        detect_args = dict(minSize=self.face_min_size, maxSize=self.face_max_size)
+        try:
+            faces = self.face_cascade.detectMultiScale(small, 1.1, 4, **detect_args)
+        except cv2.error as e:
+            # Some OpenCL drivers can't run the cascade kernels; fall back for good
+            logger.warning(f"OpenCL face detection failed, using the CPU: {e}")
+            self.use_opencl = False
+            gray = gray.get() if isinstance(gray, cv2.UMat) else gray
+            small = small.get() if isinstance(small, cv2.UMat) else small
+            faces = self.face_cascade.detectMultiScale(small, 1.1, 4, **detect_args)
+        faces = [[int(v / scale) for v in face] for face in faces]
+        
+        detections = []
         for (x, y, w, h) in faces:
-            # Draw rectangle around face
-            cv2.rectangle(frame, (x, y), (x+w, y+h), (255, 0, 0), 2)
+            eyes = []
             
             # Detect eyes within face region if eye cascade is available
             if self.eye_cascade is not None:
-                roi_gray = gray[y:y+h, x:x+w]
-                roi_color = frame[y:y+h, x:x+w]
-                eyes = self.eye_cascade.detectMultiScale(roi_gray)
-                
-                for (ex, ey, ew, eh) in eyes:
-                    cv2.rectangle(roi_color, (ex, ey), (ex+ew, ey+eh), (0, 255, 0), 2)
+                # A UMat ROI is a view on the device image, no host copy
+                if isinstance(gray, cv2.UMat):
+                    roi_gray = cv2.UMat(gray, (y, y+h), (x, x+w))
+                else:
+                    roi_gray = gray[y:y+h, x:x+w]
+                eyes = [list(eye) for eye in self.eye_cascade.detectMultiScale(roi_gray)]
+            
+            detections.append(((x, y, w, h), eyes))
+        
+        return detections
+    
+    def draw_faces(self, frame, detections):
+        """Draw face and eye boxes returned by find_faces"""
+        for (x, y, w, h), eyes in detections:
+            # Draw rectangle around face
+            cv2.rectangle(frame, (x, y), (x+w, y+h), (255, 0, 0), 2)
+            
+            roi_color = frame[y:y+h, x:x+w]
+            for (ex, ey, ew, eh) in eyes:
+                cv2.rectangle(roi_color, (ex, ey), (ex+ew, ey+eh), (0, 255, 0), 2)
             
             # Add face label
             cv2.putText(frame, 'Face', (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (255, 0, 0), 2)
-        
-        self.stats['faces_detected'] += len(faces)
+    
+    def _detection_worker(self):
+        """Run face detection on the freshest submitted frame until stopped"""
+        while not self._detection_stop.is_set():
+            try:
+                gray = self._detection_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if self.face_cascade is None:
+                continue
+            
+            try:
+                detections = self.find_faces(None, gray=gray)
+                with self._latest_frame_lock:
+                    self._latest_detections = detections
+                self.stats['faces_detected'] += len(detections)
+            except Exception as e:
+                logger.error(f"Face detection worker failed: {e}")
+    
+    def submit_for_detection(self, gray):
+        """Hand a gray frame to the detection worker, replacing any it hasn't taken yet"""
+        try:
+            self._detection_queue.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            self._detection_queue.put_nowait(gray)
+        except queue.Full:
+            pass
     
     def detect_motion(self, frame):
         """Detect motion in the frame"""
-        fg_mask = self.background_subtractor.apply(frame)
-        contours, _ = cv2.findContours(fg_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
-        motion_detected = False
-        for contour in contours:
-            if cv2.contourArea(contour) > self.motion_threshold:
-                motion_detected = True
-                x, y, w, h = cv2.boundingRect(contour)
-                cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 255, 255), 2)
-                cv2.putText(frame, 'Motion', (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
-        
-        if motion_detected:
+        # Model the background at half resolution into reused buffers; boxes
+        # are scaled back up and the area threshold scaled down to match
+        height, width = frame.shape[:2]
+        small_shape = (height // 2, width // 2)
+        small = cv2.resize(frame, small_shape[::-1], interpolation=cv2.INTER_AREA,
+                           dst=self._buf('motion_small', small_shape + frame.shape[2:], frame.dtype))
+        fg_mask = self.background_subtractor.apply(small, fgmask=self._buf('motion_mask', small_shape),
+                                                   learningRate=-1)
+        
+        # Noise reduction
+        cv2.morphologyEx(fg_mask, cv2.MORPH_OPEN, self.motion_kernel, dst=fg_mask)
+        
+        # Label blobs in one call; stats rows are (x, y, w, h, area), row 0 is background
+        _, _, stats, _ = cv2.connectedComponentsWithStats(fg_mask, connectivity=8)
+        blobs = stats[1:][stats[1:, cv2.CC_STAT_AREA] > self.motion_threshold / 4]
+        
+        for x, y, w, h, _ in (blobs * 2).tolist():
+            cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 255, 255), 2)
+            cv2.putText(frame, 'Motion', (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+        
+        if len(blobs):
             self.stats['motion_events'] += 1
     
     def track_object(self, frame):
@@ -341,12 +775,45 @@ class VideoProcessor:
     
     def get_frame(self):
         """Get processed frame for streaming"""
+        # While the capture loop runs it owns the camera; hand out its latest frame
+        if self._capture_thread is not None and self._capture_thread.is_alive():
+            return self.peek_frame()
+        return self._capture_frame()
+    
+    def peek_frame(self, raw=False):
+        """Copy of the latest captured frame, without re-running the pipeline"""
+        if self._capture_thread is None or not self._capture_thread.is_alive():
+            return None
+        
+        if raw:
+            # Ask the capture loop to keep its next frame before any filter or
+            # overlay touches it
+            with self._raw_request_lock:
+                self._raw_ready.clear()
+                self._raw_requested = True
+                if not self._raw_ready.wait(timeout=1.0):
+                    self._raw_requested = False
+                    return None
+                return self._last_raw
+        
+        with self._frame_lock:
+            frame = self._latest_frame
+            return None if frame is None else frame.copy()
+    
+    def _capture_frame(self):
+        """Read one frame from the camera and run it through the pipeline"""
         if not self.cap or not self.cap.isOpened():
             return None
         
         ret, frame = self.cap.read()
         if not ret:
             return None
+        self.frame_id += 1
+        
+        if self._raw_requested:
+            self._last_raw = frame.copy()
+            self._raw_requested = False
+            self._raw_ready.set()
         
         if self.processing_enabled:
             frame = self.process_frame(frame)
@@ -356,42 +823,171 @@ class VideoProcessor:
         
         return frame
     
+    def _capture_loop(self):
+        """Capture, process and encode frames, then publish them to stream clients"""
+        while not self._capture_stop.is_set():
+            try:
+                # Frames live in reused buffers, so readers copy the latest one
+                # under this lock before the next frame overwrites it
+                with self._frame_lock:
+                    frame = self._capture_frame()
+                    if frame is not None:
+                        self._latest_frame = frame
+                if frame is None:
+                    time.sleep(0.1)
+                    continue
+                
+                frame_bytes = self.encode_jpeg(frame)
+                if frame_bytes is None:
+                    continue
+                
+                # Each client holds at most one frame; a slow client skips
+                # frames instead of backing up the camera
+                with self._stream_clients_lock:
+                    clients = list(self._stream_clients)
+                for client in clients:
+                    try:
+                        client.get_nowait()
+                    except queue.Empty:
+                        pass
+                    try:
+                        client.put_nowait(frame_bytes)
+                    except queue.Full:
+                        pass
+            except Exception as e:
+                logger.error(f"Capture loop failed: {e}")
+                time.sleep(0.1)
+    
+    def subscribe_stream(self):
+        """Register a stream client and return the queue its JPEG frames arrive on"""
+        client = queue.Queue(maxsize=1)
+        if self._encoded_frame is not None:
+            client.put_nowait(self._encoded_frame)
+        with self._stream_clients_lock:
+            self._stream_clients.append(client)
+        return client
+    
+    def unsubscribe_stream(self, client):
+        """Remove a stream client registered with subscribe_stream"""
+        with self._stream_clients_lock:
+            if client in self._stream_clients:
+                self._stream_clients.remove(client)
+    
+    def encode_jpeg(self, frame):
+        """JPEG-encode a captured frame, re-encoding only new frames"""
+        frame_id = self.frame_id
+        if frame_id == self._encoded_frame_id:
+            return self._encoded_frame
+        
+        start_time = time.perf_counter()
+        ret, buffer = cv2.imencode('.jpg', frame, [
+            cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality,
+            cv2.IMWRITE_JPEG_OPTIMIZE, 0
+        ])
+        if not ret:
+            return None
+        self._encode_times.append(time.perf_counter() - start_time)
+        self._adapt_jpeg_quality()
+        
+        self._encoded_frame = buffer.tobytes()
+        self._encoded_frame_id = frame_id
+        return self._encoded_frame
+    
+    def _adapt_jpeg_quality(self):
+        """Step JPEG quality down when encoding is slow and back up when it recovers"""
+        if len(self._encode_times) < self._encode_times.maxlen:
+            return
+        
+        mean_encode_ms = sum(self._encode_times) / len(self._encode_times) * 1000
+        levels = (85, 70, 60)
+        level = levels.index(self.jpeg_quality)
+        if mean_encode_ms > 20 and level < len(levels) - 1:
+            level += 1
+        elif mean_encode_ms < 10 and level > 0:
+            level -= 1
+        else:
+            return
+        
+        self.jpeg_quality = levels[level]
+        self._encode_times.clear()
+        logger.info(f"JPEG encode averaging {mean_encode_ms:.1f}ms, quality set to {self.jpeg_quality}")
+    
     def add_overlay_info(self, frame):
         """Add overlay information to the frame"""
         height, width = frame.shape[:2]
         
-        # Add timestamp
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        cv2.putText(frame, timestamp, (10, height - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-        
-        # Add processing status
-        status = "Processing: ON" if self.processing_enabled else "Processing: OFF"
-        cv2.putText(frame, status, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0) if self.processing_enabled else (0, 0, 255), 2)
-        
-        # Add frame counter
-        cv2.putText(frame, f"Frames: {self.stats['frames_processed']}", (width - 150, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+        # Add timestamp (re-rendered once per second)
+        second = int(time.time())
+        self._blit_text(frame, 'timestamp', second,
+                        lambda: datetime.fromtimestamp(second).strftime("%Y-%m-%d %H:%M:%S"),
+                        (10, height - 10), 0.5, (255, 255, 255), 1)
+        
+        # Add processing status (re-rendered when it toggles)
+        enabled = self.processing_enabled
+        self._blit_text(frame, 'status', enabled,
+                        lambda: "Processing: ON" if enabled else "Processing: OFF",
+                        (10, 30), 0.7, (0, 255, 0) if enabled else (0, 0, 255), 2)
+        
+        # Add frame counter (re-rendered every 10 frames)
+        frames = self.stats['frames_processed']
+        self._blit_text(frame, 'frames', frames // 10, lambda: f"Frames: {frames}",
+                        (width - 150, 30), 0.5, (255, 255, 255), 1)
     
-    def save_frame(self, frame, filename=None):
-        """Save frame to local storage and optionally to cloud"""
+    def _blit_text(self, frame, slot, key, make_text, org, scale, color, thickness):
+        """Paste a cached text tile at org, rendering it only when key changes"""
+        cached = self._overlay_cache.get(slot)
+        if cached is None or cached[0] != key:
+            text = make_text()
+            (text_w, text_h), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, scale, thickness)
+            tile = np.zeros((text_h + baseline + thickness, text_w + thickness, 3), np.uint8)
+            cv2.putText(tile, text, (0, text_h), cv2.FONT_HERSHEY_SIMPLEX, scale, color, thickness)
+            cached = (key, tile, tile.any(axis=2)[..., None], text_h)
+            self._overlay_cache[slot] = cached
+        _, tile, mask, text_h = cached
+        
+        # Clip the tile to the frame; org is the text baseline as in putText
+        x, y = org[0], org[1] - text_h
+        x0, y0 = max(x, 0), max(y, 0)
+        x1 = min(x + tile.shape[1], frame.shape[1])
+        y1 = min(y + tile.shape[0], frame.shape[0])
+        if x0 >= x1 or y0 >= y1:
+            return
+        tile_region = (slice(y0 - y, y1 - y), slice(x0 - x, x1 - x))
+        np.copyto(frame[y0:y1, x0:x1], tile[tile_region], where=mask[tile_region])
+    
+    def save_frame(self, frame, filename=None, persist_local=False):
+        """Save frame to cloud storage and optionally to local storage"""
         if filename is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"frame_{timestamp}.jpg"
         
-        # Save locally
-        local_path = os.path.join('saved_frames', filename)
-        os.makedirs('saved_frames', exist_ok=True)
-        cv2.imwrite(local_path, frame)
+        # Encode once; the same bytes go to S3 and/or disk
+        ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+        if not ret:
+            raise ValueError("Failed to encode frame")
         
-        # Save to S3 if available
+        # Upload straight from memory when S3 is available
+        saved_path = None
         if self.s3_client:
             try:
                 bucket_name = os.getenv('S3_BUCKET_NAME', 'video-processing-frames')
-                self.s3_client.upload_file(local_path, bucket_name, f"frames/{filename}")
+                self.s3_client.upload_fileobj(
+                    io.BytesIO(buffer.tobytes()), bucket_name, f"frames/{filename}",
+                    ExtraArgs={'ContentType': 'image/jpeg'}
+                )
+                saved_path = f"s3://{bucket_name}/frames/{filename}"
                 logger.info(f"Frame uploaded to S3: {filename}")
             except Exception as e:
                 logger.error(f"Failed to upload frame to S3: {e}")
         
-        return local_path
+        # Save locally when asked to, or when the frame isn't stored anywhere else
+        if persist_local or saved_path is None:
+            local_path = os.path.join('saved_frames', filename)
+            os.makedirs('saved_frames', exist_ok=True)
+            buffer.tofile(local_path)
+            saved_path = local_path
+        
+        return saved_path
     
     def send_to_kinesis(self, analysis_result):
         """Send analysis results to Kinesis stream"""
@@ -399,7 +995,6 @@ class VideoProcessor:
             return
             
         try:
-            stream_name = os.getenv('KINESIS_STREAM_NAME', 'video-analytics-stream')
             data = {
                 'timestamp': time.time(),
                 'analysis': analysis_result,
@@ -408,16 +1003,65 @@ class VideoProcessor:
                 'frame_id': self.stats['frames_processed']
             }
             
-            response = self.kinesis_client.put_record(
-                StreamName=stream_name,
-                Data=json.dumps(data),
-                PartitionKey=str(data['timestamp'])
-            )
-            
-            logger.debug(f"Data sent to Kinesis: {response['SequenceNumber']}")
+            # Queue for the background flusher; when it falls behind, drop
+            # the oldest record rather than block the render thread
+            self._ensure_kinesis_flusher()
+            try:
+                self._kinesis_queue.put_nowait(data)
+            except queue.Full:
+                try:
+                    self._kinesis_queue.get_nowait()
+                except queue.Empty:
+                    pass
+                self._kinesis_queue.put_nowait(data)
         except Exception as e:
             logger.error(f"Failed to send data to Kinesis: {e}")
     
+    def _ensure_kinesis_flusher(self):
+        """Start the Kinesis flusher thread if this process doesn't have one yet"""
+        if self._kinesis_pid == os.getpid():
+            return
+        with self._kinesis_start_lock:
+            if self._kinesis_pid == os.getpid():
+                return
+            # A queue inherited across fork has no consumer, so start fresh
+            self._kinesis_queue = queue.Queue(maxsize=1000)
+            self._kinesis_thread = threading.Thread(target=self._kinesis_flush_loop, daemon=True)
+            self._kinesis_thread.start()
+            self._kinesis_pid = os.getpid()
+    
+    def _kinesis_flush_loop(self):
+        """Send queued analysis records to Kinesis in put_records batches"""
+        while True:
+            # Collect up to 500 records (the put_records limit) or 1 s worth
+            batch = [self._kinesis_queue.get()]
+            deadline = time.time() + 1.0
+            while len(batch) < 500:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._kinesis_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            try:
+                stream_name = os.getenv('KINESIS_STREAM_NAME', 'video-analytics-stream')
+                response = self.kinesis_client.put_records(
+                    StreamName=stream_name,
+                    Records=[
+                        {'Data': dumps_json(data), 'PartitionKey': str(data['timestamp'])}
+                        for data in batch
+                    ]
+                )
+                
+                failed = response.get('FailedRecordCount', 0)
+                if failed:
+                    logger.warning(f"Kinesis rejected {failed} of {len(batch)} records")
+                logger.debug(f"Sent {len(batch)} records to Kinesis")
+            except Exception as e:
+                logger.error(f"Failed to send data to Kinesis: {e}")
+    
     def get_stats(self):
         """Get processing statistics"""
         runtime = time.time() - self.stats['start_time']
@@ -440,10 +1084,10 @@ class VideoProcessor:
             # Get quality scores
             quality_scores = self.stats.get('quality_scores', [])
             if quality_scores:
-                avg_quality = sum(quality_scores) / len(quality_scores)
-                stats['avg_quality_score'] = round(avg_quality, 2)
-                stats['max_quality_score'] = round(max(quality_scores), 2)
-                stats['min_quality_score'] = round(min(quality_scores), 2)
+                scores = np.fromiter(quality_scores, dtype=np.float64, count=len(quality_scores))
+                stats['avg_quality_score'] = round(float(scores.mean()), 2)
+                stats['max_quality_score'] = round(float(scores.max()), 2)
+                stats['min_quality_score'] = round(float(scores.min()), 2)
             
             # Add count of advanced analyses
             stats['advanced_analysis_count'] = self.stats.get('advanced_analysis_count', 0)
@@ -458,21 +1102,23 @@ class VideoProcessor:
 # Global video processor instance
 video_processor = VideoProcessor()
 
+# Multipart header sent before every JPEG in the MJPEG stream
+FRAME_PREFIX = b'--frame\r\nContent-Type: image/jpeg\r\n\r\n'
+
 def generate_frames():
     """Generate video frames for streaming"""
-    while True:
-        frame = video_processor.get_frame()
-        if frame is None:
-            time.sleep(0.1)
-            continue
-        
-        ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-        if not ret:
-            continue
-        
-        frame_bytes = buffer.tobytes()
-        yield (b'--frame\r\n'
-               b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+    # Block on this client's queue; the capture thread fills it as frames arrive
+    frames = video_processor.subscribe_stream()
+    try:
+        while True:
+            try:
+                frame_bytes = frames.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            
+            yield FRAME_PREFIX + frame_bytes + b'\r\n'
+    finally:
+        video_processor.unsubscribe_stream(frames)
 
 @app.route('/')
 def index():
@@ -525,12 +1171,14 @@ def get_options():
 @app.route('/api/save_frame', methods=['POST'])
 def save_frame():
     """Save current frame"""
-    frame = video_processor.get_frame()
+    data = request.get_json(silent=True) or {}
+    
+    frame = video_processor.peek_frame()
     if frame is None:
         return jsonify({'success': False, 'message': 'No frame available'})
     
     try:
-        path = video_processor.save_frame(frame)
+        path = video_processor.save_frame(frame, persist_local=data.get('persist_local', False))
         return jsonify({'success': True, 'path': path, 'message': 'Frame saved successfully'})
     except Exception as e:
         return jsonify({'success': False, 'message': f'Failed to save frame: {str(e)}'})
@@ -541,7 +1189,8 @@ def start_tracking():
     data = request.get_json()
     bbox = data.get('bbox')  # [x, y, width, height]
     
-    frame = video_processor.get_frame()
+    # Track on the camera image itself, not on a frame with overlays drawn
+    frame = video_processor.peek_frame(raw=True)
     if frame is None:
         return jsonify({'success': False, 'message': 'No frame available'})
     
@@ -573,7 +1222,9 @@ def reset_stats():
         'faces_detected': 0,
         'motion_events': 0,
         'processing_time': 0,
-        'start_time': time.time()
+        'start_time': time.time(),
+        'advanced_analysis_count': 0,
+        'quality_scores': deque(maxlen=100)
     }
     return jsonify({'success': True, 'message': 'Statistics reset'})
 
@@ -609,48 +1260,63 @@ def cloud_upload():
             'success': False,
             'message': 'Cloud storage not configured. Set AWS credentials in .env file.'
         })
+    
+    data = request.get_json(silent=True) or {}
+    persist_local = data.get('persist_local', False)
         
-    frame = video_processor.get_frame()
+    frame = video_processor.peek_frame()
     if frame is None:
         return jsonify({'success': False, 'message': 'No frame available'})
     
-    # If advanced processing is enabled, get analysis
+    # If advanced processing is enabled, reuse the stream's latest analysis
     analysis = None
     if (video_processor.processing_options.get('advanced_analysis', False) and 
         video_processor.advanced_processor):
-        try:
-            analysis = video_processor.advanced_processor.comprehensive_analysis(frame)
-        except Exception as e:
-            logger.error(f"Error getting analysis: {e}")
+        analysis = video_processor.last_analysis
+        if analysis is None:
+            try:
+                analysis = video_processor.advanced_processor.comprehensive_analysis(frame)
+            except Exception as e:
+                logger.error(f"Error getting analysis: {e}")
     
     try:
-        # Save frame as image
+        # Encode the frame in memory
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        local_path = f"saved_frames/frame_{timestamp}.jpg"
-        os.makedirs('saved_frames', exist_ok=True)
-        cv2.imwrite(local_path, frame)
+        ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+        if not ret:
+            raise ValueError("Failed to encode frame")
+        
+        # Local copies are optional; uploads go straight from memory
+        local_path = None
+        if persist_local:
+            local_path = f"saved_frames/frame_{timestamp}.jpg"
+            os.makedirs('saved_frames', exist_ok=True)
+            buffer.tofile(local_path)
         
         # Upload to S3
         bucket_name = os.getenv('S3_BUCKET_NAME', 'video-processing-frames')
         s3_key = f"frames/frame_{timestamp}.jpg"
         
-        video_processor.s3_client.upload_file(
-            local_path, 
-            bucket_name, 
-            s3_key
+        video_processor.s3_client.upload_fileobj(
+            io.BytesIO(buffer.tobytes()),
+            bucket_name,
+            s3_key,
+            ExtraArgs={'ContentType': 'image/jpeg'}
         )
         
         # Upload analysis if available
         if analysis:
-            json_path = f"saved_frames/analysis_{timestamp}.json"
-            with open(json_path, 'w') as f:
-                json.dump(analysis, f)
+            analysis_json = dumps_json(analysis)
+            if persist_local:
+                with open(f"saved_frames/analysis_{timestamp}.json", 'wb') as f:
+                    f.write(analysis_json)
                 
             analysis_key = f"analysis/analysis_{timestamp}.json"
-            video_processor.s3_client.upload_file(
-                json_path,
+            video_processor.s3_client.upload_fileobj(
+                io.BytesIO(analysis_json),
                 bucket_name,
-                analysis_key
+                analysis_key,
+                ExtraArgs={'ContentType': 'application/json'}
             )
         
         cloud_url = f"https://{bucket_name}.s3.amazonaws.com/{s3_key}"
@@ -777,14 +1443,25 @@ def export_data():
     """Export processing data and analytics"""
     try:
         data = request.get_json()
-        export_format = data.get('format', 'json')  # json, csv
+        export_format = data.get('format', 'json')  # json, csv, msgpack
+        
+        try:
+            precision = int(data.get('precision', 4))
+        except (TypeError, ValueError):
+            precision = -1
+        if not 0 <= precision <= 15:
+            return jsonify({
+                'success': False,
+                'message': 'precision must be an integer between 0 and 15'
+            }), 400
         
         # Get current stats
         stats = video_processor.get_stats()
         
         # Add session info
+        now = time.time()
         export_data = {
-            'export_timestamp': datetime.now().isoformat(),
+            'export_timestamp': datetime.fromtimestamp(now).isoformat(),
             'session_start': datetime.fromtimestamp(video_processor.stats['start_time']).isoformat(),
             'processing_options': video_processor.processing_options,
             'statistics': stats,
@@ -795,41 +1472,59 @@ def export_data():
             }
         }
         
+        # Analytics floats carry no meaningful precision past 4 decimals
+        export_data = round_floats(export_data, precision)
+        
         # Create export file
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Epoch seconds plus a random suffix keep names unique without strftime
+        timestamp = f"{int(now)}_{os.urandom(3).hex()}"
         filename = ""
         filepath = ""
         
         if export_format == 'json':
             filename = f"video_analytics_export_{timestamp}.json"
-            filepath = os.path.join('exports', filename)
             os.makedirs('exports', exist_ok=True)
             
-            with open(filepath, 'w') as f:
-                json.dump(export_data, f, indent=2)
-                
-        elif export_format == 'csv':
-            try:
-                import pandas as pd
-                filename = f"video_analytics_export_{timestamp}.csv"
+            if data.get('compress', True):
+                # Level 1 keeps most of the size reduction at a fraction of the CPU
+                filename += '.gz'
                 filepath = os.path.join('exports', filename)
-                os.makedirs('exports', exist_ok=True)
+                with gzip.open(filepath, 'wb', compresslevel=1) as f:
+                    f.write(dumps_json(export_data))
+            else:
+                filepath = os.path.join('exports', filename)
+                with open(filepath, 'wb') as f:
+                    f.write(dumps_json(export_data, indent=True))
                 
-                # Convert stats to DataFrame
-                df = pd.DataFrame([stats])
-                df.to_csv(filepath, index=False)
-            except ImportError:
+        elif export_format == 'csv':
+            filename = f"video_analytics_export_{timestamp}.csv"
+            filepath = os.path.join('exports', filename)
+            os.makedirs('exports', exist_ok=True)
+            
+            # Stats are a single flat row, so the stdlib writer is enough
+            with open(filepath, 'w', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=list(export_data['statistics']))
+                writer.writeheader()
+                writer.writerow(export_data['statistics'])
+        elif export_format == 'msgpack':
+            if not MSGPACK_AVAILABLE:
                 return jsonify({
                     'success': False,
-                    'message': 'pandas not installed - CSV export not available'
+                    'message': 'msgpack not installed - MessagePack export not available'
                 })
+            filename = f"video_analytics_export_{timestamp}.msgpack"
+            filepath = os.path.join('exports', filename)
+            os.makedirs('exports', exist_ok=True)
+            
+            with open(filepath, 'wb') as f:
+                f.write(dumps_msgpack(export_data))
         else:
             return jsonify({
                 'success': False,
                 'message': f'Unsupported export format: {export_format}'
             })
         
-        return jsonify({
+        return struct_response(ExportResponse, {
             'success': True,
             'message': f'Data exported to {filename}',
             'filepath': filepath,
@@ -842,9 +1537,13 @@ def export_data():
             'message': f'Export failed: {str(e)}'
         })
 
-@app.route('/health')
-def health_check():
-    """Health check endpoint for monitoring and container orchestration"""
+# Health probes are served from a cache refreshed off the request path
+HEALTH_TTL = 10
+_health_cache = {'at': 0.0, 'val': None, 'refreshing': False}
+_health_lock = threading.Lock()
+
+def _probe_health(check_cloud=True):
+    """Build the health payload, including the S3 round-trip when check_cloud is set"""
     try:
         # Check critical services
         app_status = {
@@ -862,30 +1561,99 @@ def health_check():
         
         # Check cloud connectivity if configured
         if os.getenv('AWS_ACCESS_KEY_ID'):
-            try:
-                # Simple S3 check
-                if video_processor.s3_client:
-                    _ = video_processor.s3_client.list_buckets()
-                    app_status['aws_s3'] = 'connected'
-                else:
-                    app_status['aws_s3'] = 'not_initialized'
-            except Exception as e:
-                app_status['aws_s3'] = f'error: {str(e)}'
-        
-        return jsonify(app_status)
+            if not check_cloud:
+                app_status['aws_s3'] = 'pending'
+            else:
+                try:
+                    # Simple S3 check
+                    if video_processor.s3_client:
+                        _ = video_processor.s3_client.list_buckets()
+                        app_status['aws_s3'] = 'connected'
+                    else:
+                        app_status['aws_s3'] = 'not_initialized'
+                except Exception as e:
+                    app_status['aws_s3'] = f'error: {str(e)}'
+        
+        return app_status
     except Exception as e:
-        return jsonify({
+        return {
             'status': 'unhealthy',
             'error': str(e),
             'timestamp': datetime.now().isoformat()
-        }), 500
+        }
+
+def _refresh_health():
+    """Run a full health probe and store the result"""
+    value = _probe_health()
+    with _health_lock:
+        _health_cache['at'] = time.time()
+        _health_cache['val'] = value
+        _health_cache['refreshing'] = False
+
+def _cached_health(ttl=HEALTH_TTL):
+    """Return the last health result, scheduling a background refresh once it is stale"""
+    with _health_lock:
+        value = _health_cache['val']
+        stale = time.time() - _health_cache['at'] >= ttl
+        if stale and not _health_cache['refreshing']:
+            _health_cache['refreshing'] = True
+            timer = threading.Timer(0, _refresh_health)
+            timer.daemon = True
+            timer.start()
+    
+    if value is None:
+        # First probe: answer from local state while S3 is checked in the background
+        value = _probe_health(check_cloud=False)
+    return value
+
+@app.route('/health')
+def health_check():
+    """Health check endpoint for monitoring and container orchestration"""
+    app_status = _cached_health()
+    response = struct_response(HealthResponse, app_status)
+    if app_status.get('status') != 'healthy':
+        response.status_code = 500
+    response.headers['Cache-Control'] = f'max-age={HEALTH_TTL}'
+    return response
+
+def run_production_server(host, port):
+    """Serve the app with gunicorn's threaded workers, falling back to the Flask server"""
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        logger.warning("gunicorn not installed - using the Flask development server")
+        app.run(host=host, port=port, threaded=True)
+        return
+    
+    class StandaloneApplication(BaseApplication):
+        def __init__(self, application, options):
+            self.application = application
+            self.options = options
+            super().__init__()
+        
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+        
+        def load(self):
+            return self.application
+    
+    # Camera, stream clients and stats live in this process, so one worker by default
+    options = {
+        'bind': f'{host}:{port}',
+        'workers': int(os.getenv('WEB_CONCURRENCY', 1)),
+        'worker_class': 'gthread',
+        'threads': int(os.getenv('WEB_THREADS', 8)),
+        'timeout': 120,
+        'preload_app': True
+    }
+    StandaloneApplication(app, options).run()
 
 if __name__ == '__main__':
     # Check for required dependencies
     try:
         import cv2
         import numpy as np
-        from PIL import Image
         logger.info("Core dependencies verified")
     except ImportError as e:
         logger.error(f"Missing required dependency: {e}")
@@ -916,4 +1684,7 @@ if __name__ == '__main__':
     logger.info(f"Starting server on {host}:{port}")
     logger.info(f"Web interface: http://localhost:{port}")
     
-    app.run(debug=debug, host=host, port=port, threaded=True)
+    if debug:
+        app.run(debug=debug, host=host, port=port, threaded=True)
+    else:
+        run_production_server(host, port)
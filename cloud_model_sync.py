@@ -5,12 +5,26 @@ Download and synchronize ML models from cloud storage (AWS S3)
 
 import os
 import sys
+import asyncio
 import boto3
+import hashlib
+import json
 import logging
 import botocore
+import botocore.config
+import functools
+from boto3.s3.transfer import TransferConfig
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 from dotenv import load_dotenv
 
+# Optional asyncio S3 client
+try:
+    import aioboto3
+    AIOBOTO3_AVAILABLE = True
+except ImportError:
+    AIOBOTO3_AVAILABLE = False
+
 # Load environment variables
 load_dotenv()
 
@@ -25,21 +39,61 @@ logger = logging.getLogger("ModelSync")
 DEFAULT_MODEL_DIR = "models"
 DEFAULT_BUCKET = os.getenv("S3_BUCKET_NAME", "video-processing-models")
 DEFAULT_PREFIX = "models/"
+DOWNLOAD_CONCURRENCY = int(os.getenv("S3_DL_CONCURRENCY", "16"))
+ETAG_SIDECAR = ".etags.json"
+
+# Multipart/ranged transfers so large model weights use several connections
+MB = 1024 * 1024
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * MB,
+    multipart_chunksize=16 * MB,
+    max_concurrency=16,
+    use_threads=True
+)
+
+@functools.lru_cache(maxsize=1)
+def _create_s3_client():
+    """Build the shared S3 client; exceptions are not cached, so a failed setup is retried"""
+    session = boto3.session.Session(
+        aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
+        aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
+        region_name=os.getenv('AWS_REGION', 'us-east-1')
+    )
+    # Enough pooled connections for the transfer threads, with keep-alive sockets
+    config = botocore.config.Config(
+        max_pool_connections=64,
+        retries={'max_attempts': 5, 'mode': 'adaptive'},
+        tcp_keepalive=True
+    )
+    return session.client('s3', config=config)
 
 def setup_s3_client():
-    """Set up and return S3 client"""
+    """Set up and return the shared S3 client"""
     try:
-        s3_client = boto3.client(
-            's3',
-            aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-            aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-            region_name=os.getenv('AWS_REGION', 'us-east-1')
-        )
-        return s3_client
+        return _create_s3_client()
     except Exception as e:
         logger.error(f"Failed to set up S3 client: {e}")
         return None
 
+def file_md5(path, chunk_size=MB):
+    """Hex MD5 of a local file, read in chunks to match single-part S3 ETags"""
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def iter_s3_objects(s3_client, bucket_name, prefix):
+    """Yield every object under prefix, following list_objects_v2 continuation pages"""
+    paginator = s3_client.get_paginator('list_objects_v2')
+    pages = paginator.paginate(
+        Bucket=bucket_name,
+        Prefix=prefix,
+        PaginationConfig={'PageSize': 1000}
+    )
+    for page in pages:
+        yield from page.get('Contents', [])
+
 def download_models_from_s3(bucket_name=DEFAULT_BUCKET, 
                           prefix=DEFAULT_PREFIX, 
                           target_dir=DEFAULT_MODEL_DIR):
@@ -53,36 +107,36 @@ def download_models_from_s3(bucket_name=DEFAULT_BUCKET,
         # Ensure target directory exists
         os.makedirs(target_dir, exist_ok=True)
         
-        # List objects in the bucket with given prefix
+        # Start each page's downloads while the next page is being listed;
+        # the client is safe to share across threads
         logger.info(f"Listing objects in s3://{bucket_name}/{prefix}")
-        response = s3_client.list_objects_v2(
-            Bucket=bucket_name,
-            Prefix=prefix
-        )
-        
-        if 'Contents' not in response:
-            logger.warning(f"No objects found in s3://{bucket_name}/{prefix}")
-            return False
-        
-        # Download each object
         download_count = 0
-        for obj in response['Contents']:
-            key = obj['Key']
-            file_name = os.path.basename(key)
-            
-            # Skip empty directory markers
-            if not file_name:
-                continue
+        with ThreadPoolExecutor(max_workers=DOWNLOAD_CONCURRENCY) as executor:
+            futures = {}
+            for obj in iter_s3_objects(s3_client, bucket_name, prefix):
+                key = obj['Key']
+                file_name = os.path.basename(key)
+                
+                # Skip empty directory markers
+                if not file_name:
+                    continue
+                
+                # Create subdirectory structure if needed
+                rel_path = key[len(prefix):] if key.startswith(prefix) else key
+                target_path = os.path.join(target_dir, rel_path)
+                os.makedirs(os.path.dirname(target_path), exist_ok=True)
+                
+                logger.debug("Downloading %s to %s", key, target_path)
+                futures[executor.submit(s3_client.download_file, bucket_name, key, target_path,
+                                         Config=TRANSFER_CONFIG)] = key
             
-            # Create subdirectory structure if needed
-            rel_path = key[len(prefix):] if key.startswith(prefix) else key
-            target_path = os.path.join(target_dir, rel_path)
-            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            if not futures:
+                logger.warning(f"No objects found in s3://{bucket_name}/{prefix}")
+                return False
             
-            # Download file
-            logger.info(f"Downloading {key} to {target_path}")
-            s3_client.download_file(bucket_name, key, target_path)
-            download_count += 1
+            for future in as_completed(futures):
+                future.result()
+                download_count += 1
         
         logger.info(f"Successfully downloaded {download_count} model files")
         return True
@@ -97,6 +151,77 @@ def download_models_from_s3(bucket_name=DEFAULT_BUCKET,
         logger.error(f"Error downloading models: {e}")
         return False
 
+def iter_local_files(source_dir, prefix):
+    """Yield (local_path, s3_key) for every file under source_dir"""
+    for root, dirs, files in os.walk(source_dir):
+        for file in files:
+            if file == ETAG_SIDECAR:
+                continue
+            local_path = os.path.join(root, file)
+            rel_path = os.path.relpath(local_path, source_dir)
+            yield local_path, prefix + rel_path.replace(os.sep, '/')
+
+async def download_models_from_s3_async(bucket_name=DEFAULT_BUCKET, 
+                                        prefix=DEFAULT_PREFIX, 
+                                        target_dir=DEFAULT_MODEL_DIR):
+    """Download ML models from S3 on one event loop with aioboto3"""
+    session = aioboto3.Session(
+        aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
+        aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
+        region_name=os.getenv('AWS_REGION', 'us-east-1')
+    )
+    semaphore = asyncio.Semaphore(DOWNLOAD_CONCURRENCY)
+    
+    async with session.client('s3') as s3_client:
+        async def fetch(key, target_path):
+            async with semaphore:
+                logger.debug("Downloading %s to %s", key, target_path)
+                await s3_client.download_file(bucket_name, key, target_path, Config=TRANSFER_CONFIG)
+        
+        os.makedirs(target_dir, exist_ok=True)
+        logger.info(f"Listing objects in s3://{bucket_name}/{prefix}")
+        
+        # Schedule each page's downloads as soon as the page arrives
+        tasks = {}
+        paginator = s3_client.get_paginator('list_objects_v2')
+        async for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix):
+            for obj in page.get('Contents', []):
+                key = obj['Key']
+                if not os.path.basename(key):
+                    continue
+                rel_path = key[len(prefix):] if key.startswith(prefix) else key
+                target_path = os.path.join(target_dir, rel_path)
+                os.makedirs(os.path.dirname(target_path), exist_ok=True)
+                tasks[key] = asyncio.ensure_future(fetch(key, target_path))
+        
+        if not tasks:
+            logger.warning(f"No objects found in s3://{bucket_name}/{prefix}")
+            return False
+        
+        results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+    
+    download_count = 0
+    for key, result in zip(tasks, results):
+        if isinstance(result, Exception):
+            logger.error(f"Failed to download {key}: {result}")
+        else:
+            download_count += 1
+    
+    logger.info(f"Successfully downloaded {download_count} model files")
+    return download_count == len(tasks)
+
+def download_models(bucket_name=DEFAULT_BUCKET, 
+                    prefix=DEFAULT_PREFIX, 
+                    target_dir=DEFAULT_MODEL_DIR):
+    """Download models with aioboto3 when installed, otherwise with the thread pool"""
+    if not AIOBOTO3_AVAILABLE:
+        return download_models_from_s3(bucket_name, prefix, target_dir)
+    try:
+        return asyncio.run(download_models_from_s3_async(bucket_name, prefix, target_dir))
+    except Exception as e:
+        logger.error(f"Error downloading models: {e}")
+        return False
+
 def upload_models_to_s3(bucket_name=DEFAULT_BUCKET, 
                        prefix=DEFAULT_PREFIX, 
                        source_dir=DEFAULT_MODEL_DIR):
@@ -111,15 +236,24 @@ def upload_models_to_s3(bucket_name=DEFAULT_BUCKET,
             logger.error(f"Source directory {source_dir} does not exist")
             return False
         
+        # Walk lazily and keep at most two uploads per worker in flight
         upload_count = 0
-        for root, dirs, files in os.walk(source_dir):
-            for file in files:
-                local_path = os.path.join(root, file)
-                rel_path = os.path.relpath(local_path, source_dir)
-                s3_key = prefix + rel_path.replace(os.sep, '/')
+        max_pending = DOWNLOAD_CONCURRENCY * 2
+        with ThreadPoolExecutor(max_workers=DOWNLOAD_CONCURRENCY) as executor:
+            pending = set()
+            for local_path, s3_key in iter_local_files(source_dir, prefix):
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+                        upload_count += 1
                 
-                logger.info(f"Uploading {local_path} to s3://{bucket_name}/{s3_key}")
-                s3_client.upload_file(local_path, bucket_name, s3_key)
+                logger.debug("Uploading %s to s3://%s/%s", local_path, bucket_name, s3_key)
+                pending.add(executor.submit(s3_client.upload_file, local_path, bucket_name, s3_key,
+                                            Config=TRANSFER_CONFIG))
+            
+            for future in as_completed(pending):
+                future.result()
                 upload_count += 1
         
         logger.info(f"Successfully uploaded {upload_count} model files")
@@ -129,29 +263,28 @@ def upload_models_to_s3(bucket_name=DEFAULT_BUCKET,
         logger.error(f"Error uploading models: {e}")
         return False
 
-def check_model_versions(bucket_name=DEFAULT_BUCKET, prefix=DEFAULT_PREFIX):
+def model_info_from_object(obj):
+    """Summarize a list_objects_v2 entry for version comparison"""
+    return {
+        'size': obj['Size'],
+        'last_modified': obj['LastModified'].isoformat(),
+        'modified_ts': obj['LastModified'].timestamp(),
+        'etag': obj['ETag'].strip('"'),
+        's3_key': obj['Key']
+    }
+
+def check_model_versions(bucket_name=DEFAULT_BUCKET, prefix=DEFAULT_PREFIX, s3_client=None):
     """Check for model version updates in S3"""
-    s3_client = setup_s3_client()
+    s3_client = s3_client or setup_s3_client()
     if not s3_client:
         return {}
     
     try:
-        response = s3_client.list_objects_v2(
-            Bucket=bucket_name,
-            Prefix=prefix
-        )
-        
         models = {}
-        if 'Contents' in response:
-            for obj in response['Contents']:
-                key = obj['Key']
-                file_name = os.path.basename(key)
-                if file_name:
-                    models[file_name] = {
-                        'size': obj['Size'],
-                        'last_modified': obj['LastModified'].isoformat(),
-                        's3_key': key
-                    }
+        for obj in iter_s3_objects(s3_client, bucket_name, prefix):
+            file_name = os.path.basename(obj['Key'])
+            if file_name:
+                models[file_name] = model_info_from_object(obj)
         
         return models
         
@@ -165,48 +298,112 @@ def sync_models(bucket_name=DEFAULT_BUCKET,
     """Synchronize models - download only if newer or missing"""
     logger.info("Starting model synchronization...")
     
-    # Check what's available in S3
-    remote_models = check_model_versions(bucket_name, prefix)
-    if not remote_models:
-        logger.warning("No models found in S3 or connection failed")
+    # One client for the listing and every download below
+    s3_client = setup_s3_client()
+    if not s3_client:
+        logger.error("S3 client setup failed. Cannot synchronize models.")
         return False
     
     # Ensure target directory exists
     os.makedirs(target_dir, exist_ok=True)
     
-    sync_count = 0
-    for model_name, model_info in remote_models.items():
-        local_path = os.path.join(target_dir, model_name)
-        
-        should_download = False
-        
-        if not os.path.exists(local_path):
-            logger.info(f"Model {model_name} not found locally, downloading...")
-            should_download = True
-        else:
-            # Check if local file is older or different size
-            local_stat = os.stat(local_path)
-            local_size = local_stat.st_size
-            
-            if local_size != model_info['size']:
-                logger.info(f"Model {model_name} size differs, updating...")
-                should_download = True
-        
-        if should_download:
-            try:
-                s3_client = setup_s3_client()
-                if s3_client:
-                    s3_client.download_file(bucket_name, model_info['s3_key'], local_path)
-                    logger.info(f"Downloaded {model_name}")
-                    sync_count += 1
+    # Stat every local model in one directory scan instead of per remote object
+    local_index = {}
+    with os.scandir(target_dir) as entries:
+        for entry in entries:
+            if entry.is_file():
+                local_index[entry.name] = entry.stat()
+    etag_index = load_etag_index(target_dir)
+    
+    # List, compare and schedule downloads in a single pass over the bucket
+    remote_count = 0
+    futures = {}
+    try:
+        with ThreadPoolExecutor(max_workers=DOWNLOAD_CONCURRENCY) as executor:
+            for obj in iter_s3_objects(s3_client, bucket_name, prefix):
+                model_name = os.path.basename(obj['Key'])
+                if not model_name:
+                    continue
+                remote_count += 1
+                
+                model_info = model_info_from_object(obj)
+                local_path = os.path.join(target_dir, model_name)
+                local_stat = local_index.get(model_name)
+                if needs_download(model_name, local_path, model_info, local_stat,
+                                  etag_index.get(model_name)):
+                    future = executor.submit(s3_client.download_file, bucket_name, model_info['s3_key'],
+                                             local_path, Config=TRANSFER_CONFIG)
+                    futures[future] = (model_name, model_info['etag'])
                 else:
-                    logger.error(f"S3 client not available for downloading {model_name}")
-            except Exception as e:
-                logger.error(f"Failed to download {model_name}: {e}")
+                    etag_index[model_name] = etag_entry(model_info['etag'], local_stat)
+    except Exception as e:
+        logger.error(f"Error listing models: {e}")
     
+    if not remote_count:
+        logger.warning("No models found in S3 or connection failed")
+        return False
+    
+    sync_count = 0
+    for future, (model_name, etag) in futures.items():
+        try:
+            future.result()
+            logger.debug("Downloaded %s", model_name)
+            etag_index[model_name] = etag_entry(etag, os.stat(os.path.join(target_dir, model_name)))
+            sync_count += 1
+        except Exception as e:
+            etag_index.pop(model_name, None)
+            logger.error(f"Failed to download {model_name}: {e}")
+    
+    save_etag_index(target_dir, etag_index)
     logger.info(f"Synchronization complete. Updated {sync_count} models.")
     return True
 
+def etag_entry(etag, local_stat):
+    """Sidecar record tying an ETag to the local file state it was verified against"""
+    return {'etag': etag, 'size': local_stat.st_size, 'mtime': local_stat.st_mtime}
+
+def load_etag_index(target_dir):
+    """Read the ETag sidecar written by the last sync, or an empty index"""
+    try:
+        with open(os.path.join(target_dir, ETAG_SIDECAR)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_etag_index(target_dir, etag_index):
+    """Persist the ETag sidecar next to the models"""
+    try:
+        with open(os.path.join(target_dir, ETAG_SIDECAR), 'w') as f:
+            json.dump(etag_index, f, indent=2)
+    except OSError as e:
+        logger.warning(f"Could not write ETag sidecar: {e}")
+
+def needs_download(model_name, local_path, model_info, local_stat, known=None):
+    """Decide whether the local copy of a model is missing or stale"""
+    if local_stat is None:
+        logger.debug("Model %s not found locally, downloading...", model_name)
+        return True
+    
+    # Check if local file is older or different size
+    if local_stat.st_size != model_info['size']:
+        logger.debug("Model %s size differs, updating...", model_name)
+        return True
+    
+    # Untouched since it was last synced at this ETag, so no hashing needed
+    if known and known == etag_entry(model_info['etag'], local_stat):
+        return False
+    
+    if '-' in model_info['etag']:
+        # Multipart ETags are not a content MD5; fall back to modification time
+        if local_stat.st_mtime < model_info['modified_ts']:
+            logger.debug("Model %s is newer in S3, updating...", model_name)
+            return True
+        return False
+    if file_md5(local_path) != model_info['etag']:
+        logger.debug("Model %s content differs, updating...", model_name)
+        return True
+    return False
+
 def main():
     print("=" * 70)
     print("Real-time Video Processing - Cloud Model Sync")
@@ -232,7 +429,7 @@ def main():
     
     if args.action == 'download':
         print(f"\n📥 Downloading models from s3://{args.bucket}/{args.prefix}")
-        success = download_models_from_s3(args.bucket, args.prefix, args.target)
+        success = download_models(args.bucket, args.prefix, args.target)
     elif args.action == 'upload':
         print(f"\n📤 Uploading models to s3://{args.bucket}/{args.prefix}")
         success = upload_models_to_s3(args.bucket, args.prefix, args.target)
@@ -8,11 +8,16 @@ This script downloads and sets up the ML models required for advanced video proc
 import os
 import sys
 import shutil
-import urllib.request
+import json
+import hashlib
+import functools
+import contextlib
 import logging
-import zipfile
-import tarfile
+import tempfile
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+__all__ = ['MODELS', 'download_file', 'extract_zip', 'process_model', 'download_models', 'main']
 
 logging.basicConfig(level=logging.INFO, 
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -39,90 +44,285 @@ MODELS = {
         "extract_dir": "opencv-4.7.0/data/haarcascades",
         "target_dir": "models/haarcascades",
         "description": "OpenCV Haar Cascades"
+    },
+    "lbpcascade_face": {
+        "url": "https://raw.githubusercontent.com/opencv/opencv/4.7.0/data/lbpcascades/lbpcascade_frontalface_improved.xml",
+        "filename": "lbpcascade_frontalface_improved.xml",
+        "target_dir": "models/lbpcascades",
+        "description": "OpenCV LBP Frontal Face Cascade"
     }
 }
 
+# Hashes of installed model files, used to skip downloads that are already in place
+MANIFEST_PATH = os.path.join("models", ".download_manifest.json")
+
+# Archives smaller than this stay in memory while they are extracted
+SPOOL_MAX_SIZE = 64 * 1024 * 1024
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Archives are discarded after extraction, so stage them in RAM when there is room
+SHM_DIR = "/dev/shm"
+
+# Larger downloads are split into parallel HTTP range requests
+RANGED_DOWNLOAD_THRESHOLD = 100 * 1024 * 1024
+RANGED_DOWNLOAD_PARTS = 4
+
 def create_directory(directory):
     """Create directory if it doesn't exist"""
     os.makedirs(directory, exist_ok=True)
     logger.info(f"Directory ready: {directory}")
 
+@functools.lru_cache(maxsize=1)
+def http_pool():
+    """Shared urllib3 pool so downloads from the same host reuse TLS connections, or None"""
+    try:
+        import urllib3
+    except ImportError:
+        return None
+    return urllib3.PoolManager(maxsize=RANGED_DOWNLOAD_PARTS, retries=urllib3.Retry(3, redirect=5))
+
+@contextlib.contextmanager
+def open_url(url, headers=None):
+    """Stream a GET response through the shared pool, falling back to urllib"""
+    http = http_pool()
+    if http is None:
+        import urllib.request
+        
+        with urllib.request.urlopen(urllib.request.Request(url, headers=headers or {})) as response:
+            yield response
+        return
+    
+    response = http.request('GET', url, headers=headers, preload_content=False)
+    try:
+        if response.status >= 400:
+            raise IOError(f"HTTP {response.status} for {url}")
+        yield response
+    finally:
+        if response.isclosed():
+            response.release_conn()
+        else:
+            # Drop a partially read connection rather than return it to the pool
+            response.close()
+
+def scratch_dir(expected_size=0):
+    """Memory-backed directory for download scratch files when it has room, else None (default temp)"""
+    if os.name == 'nt' or not os.path.isdir(SHM_DIR):
+        return None
+    try:
+        if shutil.disk_usage(SHM_DIR).free > 2 * max(expected_size, SPOOL_MAX_SIZE):
+            return SHM_DIR
+    except OSError:
+        pass
+    return None
+
+class RangeNotSupported(IOError):
+    """A server answered a byte-range request with something other than 206"""
+
+def fetch_range(url, fd, start, end):
+    """Download bytes start..end of url and write them at the same offset of fd"""
+    with open_url(url, {'Range': f'bytes={start}-{end}'}) as response:
+        if response.status != 206:
+            raise RangeNotSupported(f"Server ignored range request for {url}")
+        offset = start
+        for chunk in iter(lambda: response.read(DOWNLOAD_CHUNK_SIZE), b''):
+            os.pwrite(fd, chunk, offset)
+            offset += len(chunk)
+    
+    # The file is preallocated, so a short range would leave a zero-filled hole
+    if offset != end + 1:
+        raise IOError(f"Range {start}-{end} of {url} ended after {offset - start} bytes")
+
 def download_file(url, filename):
-    """Download file from URL"""
+    """Download URL into a temporary file and return it rewound, or None on failure"""
     try:
         logger.info(f"Downloading {filename} from {url}")
-        urllib.request.urlretrieve(url, filename)
+        ranged = False
+        with open_url(url) as response:
+            size = int(response.headers.get('Content-Length') or 0)
+            if size <= SPOOL_MAX_SIZE:
+                # Small or unknown size: keep it in memory until it outgrows the spool
+                buf = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE, dir=scratch_dir())
+            else:
+                # Known large size: reserve the space up front so writes don't fragment
+                buf = tempfile.TemporaryFile(dir=scratch_dir(size))
+                if hasattr(os, 'posix_fallocate'):
+                    os.posix_fallocate(buf.fileno(), 0, size)
+                ranged = (size > RANGED_DOWNLOAD_THRESHOLD and hasattr(os, 'pwrite')
+                          and response.headers.get('Accept-Ranges') == 'bytes')
+            
+            if not ranged:
+                shutil.copyfileobj(response, buf, length=DOWNLOAD_CHUNK_SIZE)
+        
+        if ranged:
+            # Fetch large archives as parallel byte ranges written in place
+            part = -(-size // RANGED_DOWNLOAD_PARTS)
+            try:
+                with ThreadPoolExecutor(max_workers=RANGED_DOWNLOAD_PARTS) as executor:
+                    futures = [executor.submit(fetch_range, url, buf.fileno(), start,
+                                               min(start + part, size) - 1)
+                               for start in range(0, size, part)]
+                    for future in futures:
+                        future.result()
+            except RangeNotSupported as e:
+                # Mirrors and redirects may not honor ranges; a plain GET still works
+                logger.warning(f"{e}, downloading {filename} in one request")
+                buf.seek(0)
+                with open_url(url) as response:
+                    shutil.copyfileobj(response, buf, length=DOWNLOAD_CHUNK_SIZE)
+                if buf.tell() != size:
+                    raise IOError(f"Expected {size} bytes from {url}, got {buf.tell()}")
+                buf.truncate()
+        
+        buf.seek(0)
         logger.info(f"Downloaded {filename} successfully")
-        return True
+        return buf
     except Exception as e:
         logger.error(f"Failed to download {filename}: {e}")
-        return False
+        return None
 
-def extract_zip(filename, extract_dir=None, target_dir=None):
-    """Extract ZIP file"""
+def extract_zip(buf, extract_dir=None, target_dir=None, filename="archive"):
+    """Extract a ZIP archive from a file object into target_dir; returns the extracted paths or None"""
+    import zipfile
+    
     try:
         logger.info(f"Extracting {filename}")
-        with zipfile.ZipFile(filename, 'r') as zip_ref:
-            if extract_dir:
-                # Extract specific directory
-                members = [m for m in zip_ref.namelist() if m.startswith(extract_dir)]
-                zip_ref.extractall("temp", members=members)
+        # Before Python 3.11 SpooledTemporaryFile lacks seekable(), which zipfile
+        # needs, so hand it the underlying BytesIO or temporary file
+        if isinstance(buf, tempfile.SpooledTemporaryFile):
+            buf = buf._file
+        with zipfile.ZipFile(buf) as zip_ref:
+            # One pass over the archive: stream each wanted member to its final path
+            target = target_dir if target_dir else "."
+            create_directory(target)
+            extracted = []
+            for zi in zip_ref.infolist():
+                if zi.is_dir() or (extract_dir and not zi.filename.startswith(extract_dir)):
+                    continue
+                rel_path = os.path.relpath(zi.filename, extract_dir) if extract_dir else zi.filename
+                if rel_path.startswith('..') or os.path.isabs(rel_path):
+                    continue
                 
-                # Move to target directory
-                if target_dir:
-                    source_dir = os.path.join("temp", extract_dir)
-                    if os.path.exists(source_dir):
-                        create_directory(target_dir)
-                        for item in os.listdir(source_dir):
-                            source_item = os.path.join(source_dir, item)
-                            target_item = os.path.join(target_dir, item)
-                            shutil.copy2(source_item, target_item)
-                            logger.info(f"Copied {item} to {target_dir}")
-            else:
-                # Extract everything
-                target = target_dir if target_dir else "."
-                zip_ref.extractall(target)
+                dest = Path(target) / rel_path
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                with zip_ref.open(zi) as src, open(dest, 'wb') as dst:
+                    shutil.copyfileobj(src, dst, length=DOWNLOAD_CHUNK_SIZE)
+                extracted.append(rel_path)
+                logger.debug("Copied %s to %s", rel_path, target)
             
-            logger.info(f"Extracted {filename} successfully")
-            return True
+            logger.info(f"Extracted {len(extracted)} files from {filename} successfully")
+            return extracted
     except Exception as e:
         logger.error(f"Failed to extract {filename}: {e}")
+        return None
+
+def write_buffer(buf, path):
+    """Write a downloaded buffer to path, copying in the kernel when it is disk-backed"""
+    with open(path, 'wb') as f:
+        if isinstance(buf, tempfile.SpooledTemporaryFile) or not hasattr(os, 'sendfile'):
+            shutil.copyfileobj(buf, f, length=DOWNLOAD_CHUNK_SIZE)
+            return
+        
+        # Large downloads live in a real temp file; sendfile moves the bytes
+        # without a round-trip through Python buffers
+        size = os.fstat(buf.fileno()).st_size
+        offset = 0
+        while offset < size:
+            sent = os.sendfile(f.fileno(), buf.fileno(), offset, size - offset)
+            if sent == 0:
+                break
+            offset += sent
+
+def file_sha256(path):
+    """Hex SHA-256 of a local file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_manifest():
+    """Read the record of previously installed model files"""
+    try:
+        with open(MANIFEST_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(manifest):
+    """Persist the record of installed model files"""
+    try:
+        create_directory(os.path.dirname(MANIFEST_PATH))
+        with open(MANIFEST_PATH, 'w') as f:
+            json.dump(manifest, f, indent=2)
+    except OSError as e:
+        logger.warning(f"Could not write download manifest: {e}")
+
+def needs_download(name, model, manifest):
+    """Check whether a model's installed files are missing or differ from the manifest"""
+    entry = manifest.get(name)
+    if not entry or entry.get("url") != model["url"]:
+        return True
+    for rel_path, sha256 in entry["files"].items():
+        path = os.path.join(model["target_dir"], rel_path)
+        if not os.path.isfile(path) or file_sha256(path) != sha256:
+            return True
+    return False
+
+def process_model(name, model, manifest, force=False):
+    """Download one model and extract or copy it into place"""
+    logger.info(f"Processing {name}: {model['description']}")
+    
+    # Model URLs are pinned releases, so verified local files are current
+    if not force and not needs_download(name, model, manifest):
+        logger.info(f"{name} is already installed and verified, skipping download")
+        return True
+    
+    # Create target directory
+    create_directory(model["target_dir"])
+    
+    # Download file
+    buf = download_file(model["url"], model["filename"])
+    if buf is None:
         return False
-    finally:
-        # Clean up temp directory
-        if os.path.exists("temp"):
-            shutil.rmtree("temp")
+    
+    with buf:
+        # Extract if needed
+        if model.get("extract", False):
+            extract_dir = model.get("extract_dir")
+            files = extract_zip(buf, extract_dir, model["target_dir"], model["filename"])
+            if files is None:
+                return False
+        else:
+            # Just write the file to the target directory
+            target_file = os.path.join(model["target_dir"], model["filename"])
+            write_buffer(buf, target_file)
+            logger.info(f"Copied {model['filename']} to {model['target_dir']}")
+            files = [model["filename"]]
+    
+    manifest[name] = {
+        "url": model["url"],
+        "files": {rel_path: file_sha256(os.path.join(model["target_dir"], rel_path))
+                  for rel_path in files}
+    }
+    return True
 
-def download_models():
+def download_models(sequential=False, force=False):
     """Download and setup all models"""
-    success_count = 0
     total_models = len(MODELS)
+    manifest = load_manifest()
     
-    for name, model in MODELS.items():
-        logger.info(f"Processing {name}: {model['description']}")
-        
-        # Create target directory
-        create_directory(model["target_dir"])
-        
-        # Set download path
-        download_path = os.path.join("downloads", model["filename"])
-        create_directory("downloads")
-        
-        # Download file
-        if download_file(model["url"], download_path):
-            
-            # Extract if needed
-            if model.get("extract", False):
-                extract_dir = model.get("extract_dir")
-                extract_zip(download_path, extract_dir, model["target_dir"])
-            else:
-                # Just copy the file to the target directory
-                target_file = os.path.join(model["target_dir"], model["filename"])
-                shutil.copy2(download_path, target_file)
-                logger.info(f"Copied {model['filename']} to {model['target_dir']}")
-            
-            success_count += 1
+    if sequential:
+        results = [process_model(name, model, manifest, force) for name, model in MODELS.items()]
+    else:
+        # Each model downloads and extracts on its own thread, so one model's
+        # extraction overlaps with the others' network transfers
+        with ThreadPoolExecutor(max_workers=total_models) as executor:
+            futures = [executor.submit(process_model, name, model, manifest, force)
+                       for name, model in MODELS.items()]
+            results = [future.result() for future in futures]
     
+    save_manifest(manifest)
+    success_count = sum(results)
     logger.info(f"Downloaded {success_count}/{total_models} models successfully")
     return success_count == total_models
 
@@ -133,8 +333,16 @@ def main():
     print(f"This script will download ML models for advanced video processing.")
     print(f"Models will be stored in the project's 'models' directory.\n")
     
+    import argparse
+    parser = argparse.ArgumentParser(description="Download ML models")
+    parser.add_argument("--sequential", action="store_true",
+                        help="Download models one at a time (useful for debugging)")
+    parser.add_argument("--force", action="store_true",
+                        help="Re-download models even if verified copies are installed")
+    args = parser.parse_args()
+    
     try:
-        if download_models():
+        if download_models(sequential=args.sequential, force=args.force):
             print("\n✅ All models downloaded and set up successfully!")
             return 0
         else:
@@ -0,0 +1,27 @@
+import numpy as np
+
+from numba_compat import NUMBA_AVAILABLE, njit, prange
+
+
+@njit('void(uint8[:, :, ::1], uint8[:, ::1])', cache=True, fastmath=True, parallel=True)
+def bgr_to_gray_u8(frame, out):
+    """BT.601 luma of a BGR frame written into out, in integer arithmetic"""
+    height, width = out.shape
+    for i in prange(height):
+        for j in range(width):
+            b = np.int32(frame[i, j, 0])
+            g = np.int32(frame[i, j, 1])
+            r = np.int32(frame[i, j, 2])
+            out[i, j] = (114 * b + 587 * g + 299 * r) // 1000
+
+
+@njit('void(uint8[:, ::1], uint8[:, :, ::1])', cache=True, fastmath=True, parallel=True)
+def gray_to_bgr_inplace(edges, out):
+    """Broadcast a single-channel image into all three channels of out"""
+    height, width = edges.shape
+    for i in prange(height):
+        for j in range(width):
+            value = edges[i, j]
+            out[i, j, 0] = value
+            out[i, j, 1] = value
+            out[i, j, 2] = value
@@ -0,0 +1,26 @@
+import numpy as np
+
+from numba_compat import NUMBA_AVAILABLE, njit, prange
+
+
+@njit(cache=True, fastmath=True)
+def _clip_u8(value):
+    """Round and saturate a float to the uint8 range"""
+    return np.uint8(min(max(value + np.float32(0.5), np.float32(0.0)), np.float32(255.0)))
+
+
+@njit('void(uint8[:, :, ::1], float32, float32, float32, uint8[:, :, ::1])',
+      cache=True, fastmath=True, parallel=True)
+def apply_bcs(frame, brightness, contrast, saturation, out):
+    """Brightness, contrast and saturation of a BGR frame in one pass; out may alias frame"""
+    height, width = out.shape[:2]
+    for i in prange(height):
+        for j in range(width):
+            b = np.float32(frame[i, j, 0])
+            g = np.float32(frame[i, j, 1])
+            r = np.float32(frame[i, j, 2])
+            y = np.float32(0.114) * b + np.float32(0.587) * g + np.float32(0.299) * r
+            # Scale chroma around luma, then apply the linear adjustment
+            out[i, j, 0] = _clip_u8(contrast * (y + saturation * (b - y)) + brightness)
+            out[i, j, 1] = _clip_u8(contrast * (y + saturation * (g - y)) + brightness)
+            out[i, j, 2] = _clip_u8(contrast * (y + saturation * (r - y)) + brightness)
@@ -0,0 +1,13 @@
+# Optional numba with a pure-Python fallback, shared by the frame kernels
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+    
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that leaves the function interpreted"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
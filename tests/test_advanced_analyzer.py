@@ -0,0 +1,50 @@
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip('cv2')
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import advanced_analyzer  # noqa: E402
+
+
+class LiveCapture:
+    """Endless, slow source: frames trickle in, so the read queue is usually empty"""
+    
+    def isOpened(self):
+        return True
+    
+    def get(self, prop):
+        return 30.0
+    
+    def read(self):
+        time.sleep(0.05)
+        return True, np.zeros((120, 160, 3), np.uint8)
+    
+    def release(self):
+        pass
+
+
+def failing_writer(*args, **kwargs):
+    raise RuntimeError("disk full")
+
+
+def test_writer_failure_stops_threaded_pipeline(monkeypatch, tmp_path):
+    monkeypatch.setattr(advanced_analyzer.cv2, 'VideoCapture', lambda source: LiveCapture())
+    monkeypatch.setattr(advanced_analyzer.cv2, 'VideoWriter', failing_writer)
+    processor = advanced_analyzer.AdvancedVideoProcessor()
+    
+    result = {}
+    worker = threading.Thread(
+        target=lambda: result.update(processor.process_video_threaded('live', sink=str(tmp_path / 'out.mp4'))),
+        daemon=True
+    )
+    worker.start()
+    worker.join(timeout=10)
+    
+    assert not worker.is_alive(), "process_video_threaded hung after the writer failed"
+    assert 'total_frames_processed' in result
@@ -0,0 +1,40 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip('cv2')
+pytest.importorskip('boto3')
+
+# The handler builds its AWS clients at import time
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda_functions'))
+import video_processor  # noqa: E402
+
+
+def outlined_frame():
+    """Mid-gray frame in the analyzed brightness range"""
+    return np.full((480, 640, 3), 120, np.uint8)
+
+
+def test_outlined_shape_is_one_object():
+    frame = outlined_frame()
+    cv2.rectangle(frame, (100, 100), (300, 250), (255, 255, 255), 3)
+    
+    analysis = video_processor.analyze_frame(frame)
+    
+    assert len(analysis['objects']) == 1
+
+
+def test_each_outlined_shape_counts_once():
+    frame = outlined_frame()
+    cv2.rectangle(frame, (50, 50), (250, 200), (255, 255, 255), 3)
+    cv2.circle(frame, (450, 300), 100, (255, 255, 255), 3)
+    
+    analysis = video_processor.analyze_frame(frame)
+    
+    assert len(analysis['objects']) == 2
+    # Reported areas follow the outline, not its bounding box
+    circle = max(analysis['objects'], key=lambda obj: obj['bbox'][0])
+    assert circle['area'] < circle['bbox'][2] * circle['bbox'][3]
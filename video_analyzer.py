@@ -1,8 +1,18 @@
 import cv2
 import numpy as np
 import logging
+import json
+import math
+import os
+import queue
+import threading
+from pathlib import Path
 from typing import List, Dict, Tuple, Optional
 import time
+import operator
+from collections import deque
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
 
 
 # Optional imports with fallbacks
@@ -24,6 +34,12 @@ try:
 except ImportError:
     YOLO_AVAILABLE = False
 
+try:
+    import tensorrt
+    TENSORRT_AVAILABLE = True
+except ImportError:
+    TENSORRT_AVAILABLE = False
+
 try:
     import mediapipe as mp
     MEDIAPIPE_AVAILABLE = True
@@ -32,14 +48,198 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# FP16 TensorRT engines exported from the YOLO weights, recorded next to them
+# so later runs skip the export
+ENGINE_CACHE_FILE = '.yolo_engines.json'
+YOLO_ENGINE_IMGSZ = 640
+YOLO_ENGINE_BATCH = 8
+
+# Landmark fields copied out of MediaPipe's protobufs, one array column each
+POSE_FIELDS = operator.attrgetter('x', 'y', 'z', 'visibility')
+POINT_FIELDS = operator.attrgetter('x', 'y', 'z')
+
+def landmarks_to_array(landmarks, fields=POINT_FIELDS, width: int = 3) -> np.ndarray:
+    """Copy a MediaPipe landmark list into an (N, width) float32 array in one pass"""
+    return np.fromiter(map(fields, landmarks), dtype=(np.float32, width), count=len(landmarks))
+
+def disk_offsets(radius: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Row and column offsets of the pixels cv2.circle fills for a solid disk"""
+    stencil = np.zeros((2 * radius + 1, 2 * radius + 1), np.uint8)
+    cv2.circle(stencil, (radius, radius), radius, 1, -1)
+    rows, cols = np.nonzero(stencil)
+    return rows - radius, cols - radius
+
+# Hand keypoints are stamped as this disk with fancy indexing rather than one
+# cv2.circle call per point
+HAND_POINT_OFFSETS = disk_offsets(3)
+
+# Pose skeleton as a (K, 2) index array for vectorized drawing; newer MediaPipe
+# releases only ship it with the Tasks API
+if MEDIAPIPE_AVAILABLE and hasattr(mp, 'solutions'):
+    POSE_CONNECTIONS = np.array(sorted(mp.solutions.pose.POSE_CONNECTIONS), np.int32)
+elif MEDIAPIPE_AVAILABLE:
+    POSE_CONNECTIONS = np.array(sorted(
+        (connection.start, connection.end)
+        for connection in mp.tasks.vision.PoseLandmarksConnections.POSE_LANDMARKS
+    ), np.int32)
+else:
+    POSE_CONNECTIONS = None
+LABEL_FONT = cv2.FONT_HERSHEY_SIMPLEX
+LABEL_CHARS = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 .:-_'
+
+class GlyphAtlas:
+    """Hershey glyphs rasterized once into masks; labels are composed from them, cached,
+    and blitted rather than run through cv2.putText on every frame"""
+    
+    def __init__(self, font: int = LABEL_FONT, scale: float = 0.5, thickness: int = 2,
+                 chars: str = LABEL_CHARS, max_labels: int = 4096):
+        self.font, self.scale, self.thickness = font, scale, thickness
+        (_, ascent), descent = cv2.getTextSize(chars, font, scale, thickness)
+        self.pad = thickness + 2
+        self.baseline = ascent + self.pad
+        self.height = ascent + descent + 2 * self.pad
+        self.max_labels = max_labels
+        self.label_masks = {}
+        
+        # putText advances in fractional pixels; Hershey widths at this scale land on
+        # half pixels, so each glyph is kept at both sub-pixel phases
+        self.advances = {
+            char: (cv2.getTextSize(char * 101, font, scale, thickness)[0][0]
+                   - cv2.getTextSize(char, font, scale, thickness)[0][0]) / 100
+            for char in chars
+        }
+        self.glyphs = {}
+        half_char = next((char for char in chars if self.advances[char] % 1 == 0.5), None)
+        if half_char is None or any(advance * 2 % 1 for advance in self.advances.values()):
+            return
+        for char in chars:
+            self.glyphs[char, 0.0] = self._render_glyph(char, '')
+            # A leading half-advance glyph and some spaces put char at x + 0.5,
+            # with the leading glyph itself off the left edge
+            self.glyphs[char, 0.5] = self._render_glyph(char, half_char + ' ' * (self.pad + 4))
+    
+    def _render_glyph(self, char: str, lead: str) -> np.ndarray:
+        """Mask of char drawn after lead, cropped to start at the pixel char lands in"""
+        offset = sum(self.advances[c] for c in lead)
+        width = cv2.getTextSize(char, self.font, self.scale, self.thickness)[0][0] + 2 * self.pad + 1
+        canvas = np.zeros((self.height, width), np.uint8)
+        cv2.putText(canvas, lead + char, (self.pad - math.floor(offset), self.baseline),
+                    self.font, self.scale, 1, self.thickness)
+        return canvas.astype(bool)
+    
+    def render(self, text: str) -> Optional[np.ndarray]:
+        """Boolean mask of text with its origin at (pad, baseline); None if a glyph is missing"""
+        mask = self.label_masks.get(text)
+        if mask is not None or not self.glyphs or not all(char in self.advances for char in text):
+            return mask
+        
+        placements = []
+        position = 0.0
+        for char in text:
+            column = math.floor(position)
+            placements.append((column, self.glyphs[char, position - column]))
+            position += self.advances[char]
+        
+        mask = np.zeros((self.height, max(column + glyph.shape[1] for column, glyph in placements)), bool)
+        for column, glyph in placements:
+            mask[:, column:column + glyph.shape[1]] |= glyph
+        
+        if len(self.label_masks) >= self.max_labels:
+            self.label_masks.clear()
+        self.label_masks[text] = mask
+        return mask
+    
+    def draw(self, image: np.ndarray, text: str, origin: Tuple[int, int], color: Tuple[int, int, int]):
+        """Same as cv2.putText(image, text, origin, font, scale, color, thickness)"""
+        mask = self.render(text) if text else None
+        if mask is None:
+            cv2.putText(image, text, origin, self.font, self.scale, color, self.thickness)
+            return
+        
+        # Clip the mask to the image before blitting
+        left, top = origin[0] - self.pad, origin[1] - self.baseline
+        x0, y0 = max(left, 0), max(top, 0)
+        x1 = min(left + mask.shape[1], image.shape[1])
+        y1 = min(top + mask.shape[0], image.shape[0])
+        if x0 < x1 and y0 < y1:
+            image[y0:y1, x0:x1][mask[y0 - top:y1 - top, x0 - left:x1 - left]] = color
+
+class TaskLandmarker:
+    """MediaPipe Tasks landmarker behind the legacy solutions process() interface, so
+    quantized .task assets and the GPU delegate can be used without touching callers"""
+    
+    def __init__(self, kind: str, model_path: str, **options):
+        vision = mp.tasks.vision
+        task_class, options_class = {
+            'pose': (vision.PoseLandmarker, vision.PoseLandmarkerOptions),
+            'hands': (vision.HandLandmarker, vision.HandLandmarkerOptions),
+            'face_mesh': (vision.FaceLandmarker, vision.FaceLandmarkerOptions)
+        }[kind]
+        self.kind = kind
+        self.last_timestamp_ms = -1
+        
+        # Prefer the GPU delegate; builds without GPU support raise on creation
+        try:
+            self.landmarker = task_class.create_from_options(options_class(
+                base_options=mp.tasks.BaseOptions(model_asset_path=model_path,
+                                                  delegate=mp.tasks.BaseOptions.Delegate.GPU),
+                running_mode=vision.RunningMode.VIDEO, **options))
+        except Exception as e:
+            logger.info(f"MediaPipe GPU delegate not available for {kind}, using CPU: {e}")
+            self.landmarker = task_class.create_from_options(options_class(
+                base_options=mp.tasks.BaseOptions(model_asset_path=model_path),
+                running_mode=vision.RunningMode.VIDEO, **options))
+    
+    def process(self, rgb_frame: np.ndarray) -> SimpleNamespace:
+        """Run the landmarker on an RGB frame; the result mirrors the legacy solution's fields"""
+        # VIDEO mode tracks across calls and needs strictly increasing timestamps
+        timestamp_ms = max(time.monotonic_ns() // 1_000_000, self.last_timestamp_ms + 1)
+        self.last_timestamp_ms = timestamp_ms
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=np.ascontiguousarray(rgb_frame))
+        result = self.landmarker.detect_for_video(image, timestamp_ms)
+        
+        if self.kind == 'pose':
+            masks = result.segmentation_masks
+            return SimpleNamespace(
+                pose_landmarks=SimpleNamespace(landmark=result.pose_landmarks[0]) if result.pose_landmarks else None,
+                segmentation_mask=masks[0].numpy_view() if masks else None
+            )
+        if self.kind == 'hands':
+            return SimpleNamespace(
+                multi_hand_landmarks=[SimpleNamespace(landmark=hand) for hand in result.hand_landmarks] or None
+            )
+        return SimpleNamespace(
+            multi_face_landmarks=[SimpleNamespace(landmark=face) for face in result.face_landmarks] or None
+        )
+
 class AdvancedVideoAnalyzer:
     """Advanced video analyzer with multiple AI models"""
     
-    def __init__(self, model_paths: Optional[Dict[str, str]] = None):
+    def __init__(self, model_paths: Optional[Dict[str, str]] = None, pose_complexity: int = 1,
+                 enable_segmentation: bool = False, refine_landmarks: bool = False):
         self.model_paths = model_paths or {}
         self.models = {}
+        
+        # Segmentation and iris refinement are extra work on every frame, so
+        # they are off unless the caller consumes them
+        self.pose_complexity = pose_complexity
+        self.enable_segmentation = enable_segmentation
+        self.refine_landmarks = refine_landmarks
         self.initialize_models()
         
+        # YOLO and the MediaPipe graphs are independent within a frame and
+        # release the GIL while they run
+        self.thread_pool = ThreadPoolExecutor(max_workers=4)
+        self.annotation_buffer = None
+        self.label_atlas = GlyphAtlas()
+        
+        # With OpenCV CUDA the color conversion (and any resize) for MediaPipe runs
+        # on the device, reusing one upload buffer and stream
+        self.use_cuda = hasattr(cv2, 'cuda') and cv2.cuda.getCudaEnabledDeviceCount() > 0
+        if self.use_cuda:
+            self.gpu_frame = cv2.cuda_GpuMat()
+            self.cuda_stream = cv2.cuda_Stream()
+        
     def initialize_models(self):
         """Initialize all AI models"""
         try:
@@ -58,6 +258,13 @@ class AdvancedVideoAnalyzer:
     
     def load_yolo_model(self):
         """Load YOLO model for object detection"""
+        # With CUDA, frames are letterboxed into a pinned host buffer and
+        # uploaded asynchronously instead of through Ultralytics' pageable copy
+        self.cuda_input = TORCH_AVAILABLE and torch.cuda.is_available()
+        self.pinned_buffer = None
+        self.yolo_fp16 = False
+        self.class_names = []
+        
         if not YOLO_AVAILABLE:
             logger.warning("YOLO not available - install ultralytics package")
             self.models['yolo'] = None
@@ -66,10 +273,50 @@ class AdvancedVideoAnalyzer:
         try:
             model_path = self.model_paths.get('yolo', 'yolov8n.pt')
             self.models['yolo'] = YOLO(model_path)
+            
+            # Class id -> name as a plain list; an exported engine keeps the same classes
+            names = self.models['yolo'].names
+            self.class_names = [names[class_id] for class_id in range(len(names))]
             logger.info("YOLO model loaded successfully")
         except Exception as e:
             logger.warning(f"YOLO model not available: {e}")
             self.models['yolo'] = None
+            return
+        
+        # Swap in a TensorRT FP16 engine when the GPU stack supports it
+        if (TENSORRT_AVAILABLE and TORCH_AVAILABLE and torch.cuda.is_available()
+                and str(model_path).endswith('.pt')):
+            try:
+                engine_path = self.tensorrt_engine_path(self.models['yolo'], model_path)
+                self.models['yolo'] = YOLO(engine_path, task='detect')
+                self.yolo_fp16 = True
+                logger.info(f"Using TensorRT engine {engine_path}")
+            except Exception as e:
+                logger.warning(f"TensorRT export failed, using PyTorch weights: {e}")
+    
+    def tensorrt_engine_path(self, model, model_path: str) -> str:
+        """Path of an FP16 TensorRT engine for model, exported and recorded on first use"""
+        weights = Path(getattr(model, 'ckpt_path', None) or model_path)
+        cache_file = weights.parent / ENGINE_CACHE_FILE
+        key = f"{weights.stem}-{YOLO_ENGINE_IMGSZ}-b{YOLO_ENGINE_BATCH}-fp16"
+        
+        try:
+            cache = json.loads(cache_file.read_text())
+        except (OSError, ValueError):
+            cache = {}
+        if cache.get(key) and Path(cache[key]).exists():
+            return cache[key]
+        
+        logger.info(f"Exporting {weights.name} to TensorRT, this takes a few minutes once")
+        exported = model.export(format='engine', half=True, imgsz=YOLO_ENGINE_IMGSZ,
+                                dynamic=True, batch=YOLO_ENGINE_BATCH)
+        
+        # Ultralytics always writes <stem>.engine; name it by its settings so
+        # engines for different settings don't overwrite each other
+        engine_path = Path(exported).rename(weights.with_name(f"{key}.engine"))
+        cache[key] = str(engine_path)
+        cache_file.write_text(json.dumps(cache, indent=2))
+        return str(engine_path)
     
     def load_mediapipe_models(self):
         """Load MediaPipe models"""
@@ -77,29 +324,48 @@ class AdvancedVideoAnalyzer:
             logger.warning("MediaPipe not available - install mediapipe package")
             return
             
+        # Quantized Tasks assets given as model_paths['pose_task'] / ['hands_task'] /
+        # ['face_mesh_task'] replace the corresponding legacy graph
+        task_options = {
+            'pose': {'num_poses': 1, 'min_pose_detection_confidence': 0.5,
+                     'output_segmentation_masks': self.enable_segmentation},
+            'hands': {'num_hands': 2, 'min_hand_detection_confidence': 0.5},
+            'face_mesh': {'num_faces': 1, 'min_face_detection_confidence': 0.5}
+        }
+        for name, options in task_options.items():
+            task_path = self.model_paths.get(f'{name}_task')
+            if task_path:
+                try:
+                    self.models[name] = TaskLandmarker(name, task_path, **options)
+                except Exception as e:
+                    logger.warning(f"MediaPipe task {task_path} not available, using the legacy model: {e}")
+        
         try:
             # Pose estimation
-            self.models['pose'] = mp.solutions.pose.Pose(
-                static_image_mode=False,
-                model_complexity=1,
-                enable_segmentation=True,
-                min_detection_confidence=0.5
-            )
+            if not self.models.get('pose'):
+                self.models['pose'] = mp.solutions.pose.Pose(
+                    static_image_mode=False,
+                    model_complexity=self.pose_complexity,
+                    enable_segmentation=self.enable_segmentation,
+                    min_detection_confidence=0.5
+                )
             
             # Hand tracking
-            self.models['hands'] = mp.solutions.hands.Hands(
-                static_image_mode=False,
-                max_num_hands=2,
-                min_detection_confidence=0.5
-            )
+            if not self.models.get('hands'):
+                self.models['hands'] = mp.solutions.hands.Hands(
+                    static_image_mode=False,
+                    max_num_hands=2,
+                    min_detection_confidence=0.5
+                )
             
             # Face mesh
-            self.models['face_mesh'] = mp.solutions.face_mesh.FaceMesh(
-                static_image_mode=False,
-                max_num_faces=1,
-                refine_landmarks=True,
-                min_detection_confidence=0.5
-            )
+            if not self.models.get('face_mesh'):
+                self.models['face_mesh'] = mp.solutions.face_mesh.FaceMesh(
+                    static_image_mode=False,
+                    max_num_faces=1,
+                    refine_landmarks=self.refine_landmarks,
+                    min_detection_confidence=0.5
+                )
             
             logger.info("MediaPipe models loaded successfully")
         except Exception as e:
@@ -107,192 +373,290 @@ class AdvancedVideoAnalyzer:
     
     def load_face_recognition_model(self):
         """Load face recognition model"""
+        # Face mesh already localizes faces, so a separate detector is only
+        # loaded when a model path is given explicitly
+        model_path = self.model_paths.get('face_cascade')
+        if not model_path:
+            self.models['face_cascade'] = None
+            return
+        
         try:
-            # This would load a pre-trained face recognition model
-            # For now, we'll use OpenCV's cascade classifier
-            self.models['face_cascade'] = cv2.CascadeClassifier(
-                cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-            )
+            if model_path.endswith('.onnx'):
+                # YuNet runs through the DNN module, which can use OpenCL/CUDA
+                self.models['face_cascade'] = cv2.FaceDetectorYN_create(model_path, '', (320, 320))
+            else:
+                self.models['face_cascade'] = cv2.CascadeClassifier(model_path)
             logger.info("Face recognition model loaded successfully")
         except Exception as e:
             logger.warning(f"Face recognition model not available: {e}")
     
-    def detect_objects(self, frame: np.ndarray) -> List[Dict]:
-        """Detect objects using YOLO"""
-        if not self.models.get('yolo'):
-            return []
+    def downscale(self, frame: np.ndarray) -> Tuple[np.ndarray, float]:
+        """Shrink a frame so its long side is at most YOLO's input size; returns the frame
+        and the factor it was scaled by, so one resize can be shared by every detector"""
+        height, width = frame.shape[:2]
+        ratio = YOLO_ENGINE_IMGSZ / max(height, width)
+        if ratio >= 1.0:
+            return frame, 1.0
+        size = (round(width * ratio), round(height * ratio))
+        return cv2.resize(frame, size, interpolation=cv2.INTER_AREA), ratio
+    
+    def detect_objects(self, frame: np.ndarray, scale: float = 1.0) -> List[Dict]:
+        """Detect objects using YOLO; scale is the factor frame was already downscaled by"""
+        return self.detect_objects_batch([frame], [scale])[0]
+    
+    def _yolo_input_tensor(self, frames: List[np.ndarray]) -> Tuple["torch.Tensor", float]:
+        """Letterbox same-sized BGR frames into the pinned buffer and start a non-blocking
+        upload; returns the normalized RGB BCHW tensor and the resize ratio"""
+        height, width = frames[0].shape[:2]
+        ratio = YOLO_ENGINE_IMGSZ / max(height, width)
+        resized_h, resized_w = round(height * ratio), round(width * ratio)
+        
+        # Pad bottom/right to the model stride with Ultralytics' gray; boxes need
+        # only dividing by ratio to map back
+        shape = (len(frames), -(-resized_h // 32) * 32, -(-resized_w // 32) * 32, 3)
+        if self.pinned_buffer is None or tuple(self.pinned_buffer.shape) != shape:
+            self.pinned_buffer = torch.full(shape, 114, dtype=torch.uint8).pin_memory()
+        host = self.pinned_buffer.numpy()
+        for index, frame in enumerate(frames):
+            host[index, :resized_h, :resized_w] = cv2.resize(
+                np.ascontiguousarray(frame), (resized_w, resized_h), interpolation=cv2.INTER_LINEAR)
+        
+        device_frames = self.pinned_buffer.to('cuda', non_blocking=True)
+        device_frames = device_frames.permute(0, 3, 1, 2).flip(1)  # BHWC BGR -> BCHW RGB
+        device_frames = device_frames.half() if self.yolo_fp16 else device_frames.float()
+        return device_frames.div_(255).contiguous(), ratio
+    
+    def detect_objects_batch(self, frames: List[np.ndarray],
+                             scales: Optional[List[float]] = None) -> List[List[Dict]]:
+        """Detect objects in several frames with one YOLO call; returns one list per frame.
+        scales gives the factor each frame was already downscaled by, and boxes are
+        returned in original-resolution coordinates"""
+        if not self.models.get('yolo') or not frames:
+            return [[] for _ in frames]
         
         try:
-            results = self.models['yolo'](frame)
-            objects = []
+            scales = scales or [1.0] * len(frames)
+            limits = [(frame.shape[1] / scale, frame.shape[0] / scale) for frame, scale in zip(frames, scales)]
+            if self.cuda_input and all(frame.shape == frames[0].shape for frame in frames):
+                source, ratio = self._yolo_input_tensor(frames)
+                box_scales = [1.0 / (scale * ratio) for scale in scales]
+            else:
+                # Hand YOLO frames already at its input size so its own letterbox
+                # only pads; large frames are shrunk once here
+                downscaled = [self.downscale(frame) for frame in frames]
+                source = [frame for frame, _ in downscaled]
+                box_scales = [1.0 / (scale * ratio) for scale, (_, ratio) in zip(scales, downscaled)]
+            
+            # Ultralytics returns one Results per input image, in order
+            results = self.models['yolo'](source, verbose=False)
+            batch_objects = []
             
-            for result in results:
+            for result, box_scale, (width, height) in zip(results, box_scales, limits):
+                objects = []
                 boxes = result.boxes
-                if boxes is not None:
-                    for box in boxes:
-                        x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                        confidence = box.conf[0].cpu().numpy()
-                        class_id = int(box.cls[0].cpu().numpy())
-                        class_name = self.models['yolo'].names[class_id]
-                        
+                if boxes is not None and len(boxes):
+                    # One device-to-host copy of the (N, 6) x1, y1, x2, y2, conf, cls
+                    # rows instead of three per box
+                    detections = boxes.data.cpu().numpy()
+                    coords = detections[:, :4] * box_scale
+                    np.minimum(coords, (width, height, width, height), out=coords)
+                    
+                    for bbox, confidence, class_id in zip(coords.astype(int).tolist(),
+                                                          detections[:, -2].tolist(),
+                                                          detections[:, -1].astype(int).tolist()):
                         objects.append({
-                            'class': class_name,
-                            'confidence': float(confidence),
-                            'bbox': [int(x1), int(y1), int(x2), int(y2)]
+                            'class': self.class_names[class_id],
+                            'confidence': confidence,
+                            'bbox': bbox
                         })
+                batch_objects.append(objects)
             
-            return objects
+            return batch_objects
         except Exception as e:
             logger.error(f"Error in object detection: {e}")
-            return []
+            return [[] for _ in frames]
+    
+    def to_rgb(self, frame: np.ndarray, size: Optional[Tuple[int, int]] = None) -> np.ndarray:
+        """Convert a BGR frame to RGB, optionally resized to (width, height), on the GPU when available"""
+        if not self.use_cuda:
+            if size is not None and size != (frame.shape[1], frame.shape[0]):
+                frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+            return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        
+        try:
+            self.gpu_frame.upload(frame, self.cuda_stream)
+            gpu_rgb = cv2.cuda.cvtColor(self.gpu_frame, cv2.COLOR_BGR2RGB, stream=self.cuda_stream)
+            if size is not None and size != (frame.shape[1], frame.shape[0]):
+                gpu_rgb = cv2.cuda.resize(gpu_rgb, size, interpolation=cv2.INTER_AREA, stream=self.cuda_stream)
+            rgb_frame = gpu_rgb.download(self.cuda_stream)
+            self.cuda_stream.waitForCompletion()
+            return rgb_frame
+        except cv2.error as e:
+            logger.warning(f"CUDA color conversion failed, falling back to CPU: {e}")
+            self.use_cuda = False
+            return self.to_rgb(frame, size)
     
-    def detect_pose(self, frame: np.ndarray) -> Dict:
-        """Detect human pose using MediaPipe"""
+    def detect_pose(self, frame: np.ndarray, rgb_frame: Optional[np.ndarray] = None) -> Dict:
+        """Detect human pose using MediaPipe; pass rgb_frame to reuse an existing RGB conversion"""
+        return self.detect_pose_with_mask(frame, rgb_frame)[0]
+    
+    def detect_pose_with_mask(self, frame: np.ndarray,
+                              rgb_frame: Optional[np.ndarray] = None) -> Tuple[Dict, Optional[np.ndarray]]:
+        """Detect human pose and also return the segmentation mask, which is None
+        unless the analyzer was created with enable_segmentation=True"""
         if not self.models.get('pose'):
-            return {}
+            return {}, None
         
         try:
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            if rgb_frame is None:
+                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
             results = self.models['pose'].process(rgb_frame)
             
             if results.pose_landmarks:
-                landmarks = []
-                for landmark in results.pose_landmarks.landmark:
-                    landmarks.append({
-                        'x': landmark.x,
-                        'y': landmark.y,
-                        'z': landmark.z,
-                        'visibility': landmark.visibility
-                    })
-                
+                # The mask is only read when segmentation was requested, and is then
+                # passed through as is rather than copied; otherwise report False
+                mask = results.segmentation_mask if self.enable_segmentation else None
+                # Columns are x, y, z, visibility
                 return {
-                    'landmarks': landmarks,
-                    'segmentation_mask': results.segmentation_mask is not None
-                }
+                    'landmarks': landmarks_to_array(results.pose_landmarks.landmark, POSE_FIELDS, 4),
+                    'segmentation_mask': mask if mask is not None else False
+                }, mask
             
-            return {}
+            return {}, None
         except Exception as e:
             logger.error(f"Error in pose detection: {e}")
-            return {}
+            return {}, None
     
-    def detect_hands(self, frame: np.ndarray) -> List[Dict]:
-        """Detect hands using MediaPipe"""
+    def detect_hands(self, frame: np.ndarray, rgb_frame: Optional[np.ndarray] = None) -> List[Dict]:
+        """Detect hands using MediaPipe; pass rgb_frame to reuse an existing RGB conversion"""
         if not self.models.get('hands'):
             return []
         
         try:
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            if rgb_frame is None:
+                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
             results = self.models['hands'].process(rgb_frame)
             
             hands = []
             if results.multi_hand_landmarks:
                 for hand_landmarks in results.multi_hand_landmarks:
-                    landmarks = []
-                    for landmark in hand_landmarks.landmark:
-                        landmarks.append({
-                            'x': landmark.x,
-                            'y': landmark.y,
-                            'z': landmark.z
-                        })
-                    hands.append({'landmarks': landmarks})
+                    # Columns are x, y, z
+                    hands.append({'landmarks': landmarks_to_array(hand_landmarks.landmark)})
             
             return hands
         except Exception as e:
             logger.error(f"Error in hand detection: {e}")
             return []
     
-    def analyze_face_mesh(self, frame: np.ndarray) -> Dict:
-        """Analyze face mesh using MediaPipe"""
+    def analyze_face_mesh(self, frame: np.ndarray, rgb_frame: Optional[np.ndarray] = None) -> Dict:
+        """Analyze face mesh using MediaPipe; pass rgb_frame to reuse an existing RGB conversion"""
         if not self.models.get('face_mesh'):
             return {}
         
         try:
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            if rgb_frame is None:
+                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
             results = self.models['face_mesh'].process(rgb_frame)
             
             if results.multi_face_landmarks:
-                face_landmarks = results.multi_face_landmarks[0]
-                landmarks = []
-                for landmark in face_landmarks.landmark:
-                    landmarks.append({
-                        'x': landmark.x,
-                        'y': landmark.y,
-                        'z': landmark.z
-                    })
-                
-                return {'landmarks': landmarks}
+                # Columns are x, y, z
+                return {'landmarks': landmarks_to_array(results.multi_face_landmarks[0].landmark)}
             
             return {}
         except Exception as e:
             logger.error(f"Error in face mesh analysis: {e}")
             return {}
     
-    def comprehensive_analysis(self, frame: np.ndarray) -> Dict:
-        """Perform comprehensive video analysis"""
-        start_time = time.time()
+    def comprehensive_analysis(self, frame: np.ndarray, objects: Optional[List[Dict]] = None) -> Dict:
+        """Perform comprehensive video analysis; objects may be precomputed by a batched YOLO call"""
+        start_ns = time.perf_counter_ns()
+        
+        # Resize once for every detector: YOLO gets the BGR buffer and MediaPipe,
+        # whose landmarks are normalized, an RGB conversion of the same buffer
+        small_frame, scale = self.downscale(frame)
+        rgb_frame = None
+        if any(self.models.get(name) for name in ('pose', 'hands', 'face_mesh')):
+            rgb_frame = self.to_rgb(small_frame)
+        
+        # (result key, model name, detector, empty result, extra args) for each detector
+        detectors = [
+            ('pose', 'pose', self.detect_pose, dict, (rgb_frame,)),
+            ('hands', 'hands', self.detect_hands, list, (rgb_frame,)),
+            ('face_mesh', 'face_mesh', self.analyze_face_mesh, dict, (rgb_frame,))
+        ]
+        if objects is None:
+            detectors.append(('objects', 'yolo', self.detect_objects, list, (scale,)))
+        
+        # Run the loaded detectors concurrently; wall time is the slowest one
+        futures = {
+            key: self.thread_pool.submit(detector, small_frame, *args)
+            for key, model_name, detector, _, args in detectors
+            if self.models.get(model_name)
+        }
+        detections = {
+            key: futures[key].result() if key in futures else empty()
+            for key, _, _, empty, _ in detectors
+        }
         
         analysis_result = {
             'timestamp': time.time(),
             'frame_size': frame.shape,
-            'objects': self.detect_objects(frame),
-            'pose': self.detect_pose(frame),
-            'hands': self.detect_hands(frame),
-            'face_mesh': self.analyze_face_mesh(frame),
-            'processing_time': 0
+            'objects': objects if objects is not None else detections['objects'],
+            'pose': detections['pose'],
+            'hands': detections['hands'],
+            'face_mesh': detections['face_mesh'],
+            'processing_time': (time.perf_counter_ns() - start_ns) / 1e9
         }
         
-        analysis_result['processing_time'] = time.time() - start_time
-        
         return analysis_result
     
-    def draw_annotations(self, frame: np.ndarray, analysis_result: Dict) -> np.ndarray:
+    def draw_annotations(self, frame: np.ndarray, analysis_result: Dict,
+                         inplace: bool = False) -> np.ndarray:
         """Draw analysis annotations on frame"""
-        annotated_frame = frame.copy()
+        if inplace:
+            annotated_frame = frame
+        else:
+            # Reuse one output buffer instead of allocating a copy per frame;
+            # the result is overwritten by the next call
+            if (self.annotation_buffer is None or self.annotation_buffer.shape != frame.shape
+                    or self.annotation_buffer.dtype != frame.dtype):
+                self.annotation_buffer = np.empty_like(frame)
+            np.copyto(self.annotation_buffer, frame)
+            annotated_frame = self.annotation_buffer
         
-        # Draw object detections
-        for obj in analysis_result.get('objects', []):
+        # Draw object detections: all boxes as closed polylines in one call,
+        # duplicates drawn once
+        objects = analysis_result.get('objects', [])
+        if objects:
+            boxes = np.unique(np.array([obj['bbox'] for obj in objects], np.int32), axis=0)
+            corners = boxes[:, [[0, 1], [2, 1], [2, 3], [0, 3]]]
+            cv2.polylines(annotated_frame, corners, True, (0, 255, 0), 2)
+        for obj in objects:
             bbox = obj['bbox']
             label = f"{obj['class']}: {obj['confidence']:.2f}"
-            
-            cv2.rectangle(annotated_frame, (bbox[0], bbox[1]), (bbox[2], bbox[3]), (0, 255, 0), 2)
-            cv2.putText(annotated_frame, label, (bbox[0], bbox[1] - 10), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+            self.label_atlas.draw(annotated_frame, label, (bbox[0], bbox[1] - 10), (0, 255, 0))
         
         # Draw pose landmarks
+        h, w = frame.shape[:2]
+        pixel_scale = np.array([w, h], np.float32)
         pose_data = analysis_result.get('pose', {})
-        if pose_data.get('landmarks'):
-            mp_pose = mp.solutions.pose
-            mp_draw = mp.solutions.drawing_utils
-            
-            # Convert normalized coordinates to pixel coordinates
-            h, w = frame.shape[:2]
-            landmarks = pose_data['landmarks']
+        if 'landmarks' in pose_data and POSE_CONNECTIONS is not None:
+            # Convert normalized coordinates to pixel coordinates, all at once
+            points = (pose_data['landmarks'][:, :2] * pixel_scale).astype(np.int32)
             
-            # Draw pose connections
-            connections = mp_pose.POSE_CONNECTIONS
-            for connection in connections:
-                start_idx, end_idx = connection
-                if start_idx < len(landmarks) and end_idx < len(landmarks):
-                    start_point = landmarks[start_idx]
-                    end_point = landmarks[end_idx]
-                    
-                    start_x = int(start_point['x'] * w)
-                    start_y = int(start_point['y'] * h)
-                    end_x = int(end_point['x'] * w)
-                    end_y = int(end_point['y'] * h)
-                    
-                    cv2.line(annotated_frame, (start_x, start_y), (end_x, end_y), (255, 0, 0), 2)
+            # Draw every pose connection as a two-point polyline in one call
+            connections = POSE_CONNECTIONS[(POSE_CONNECTIONS < len(points)).all(axis=1)]
+            cv2.polylines(annotated_frame, points[connections], False, (255, 0, 0), 2)
         
-        # Draw hand landmarks
-        hands_data = analysis_result.get('hands', [])
-        for hand in hands_data:
-            landmarks = hand.get('landmarks', [])
-            h, w = frame.shape[:2]
-            
-            for landmark in landmarks:
-                x = int(landmark['x'] * w)
-                y = int(landmark['y'] * h)
-                cv2.circle(annotated_frame, (x, y), 3, (255, 255, 0), -1)
+        # Draw hand landmarks: stamp a disk around every keypoint of every hand at once
+        hand_points = [hand['landmarks'][:, :2] for hand in analysis_result.get('hands', []) if 'landmarks' in hand]
+        if hand_points:
+            points = (np.concatenate(hand_points) * pixel_scale).astype(np.int32)
+            row_offsets, col_offsets = HAND_POINT_OFFSETS
+            rows = points[:, 1, None] + row_offsets
+            cols = points[:, 0, None] + col_offsets
+            inside = (rows >= 0) & (rows < h) & (cols >= 0) & (cols < w)
+            annotated_frame[rows[inside], cols[inside]] = (255, 255, 0)
         
         return annotated_frame
 
@@ -300,49 +664,236 @@ class AdvancedVideoAnalyzer:
 class RealTimeAnalytics:
     """Real-time analytics processor"""
     
-    def __init__(self):
+    def __init__(self, batch_size: int = 8, static_threshold: float = 2.0,
+                 full_analysis_interval: int = 30):
+        # Keep OpenCV on its SIMD code paths, and leave half the cores to the
+        # detector threads rather than oversubscribing them. These settings are
+        # process-wide, so they are applied by the real-time processor rather
+        # than on import
+        cv2.setUseOptimized(True)
+        cv2.setNumThreads(max(1, (os.cpu_count() or 1) // 2))
+        
         self.analyzer = AdvancedVideoAnalyzer()
+        
+        # Frames queued by submit_frame until a full YOLO batch is available
+        self.batch_size = batch_size
+        self.frame_buffer = deque()
+        
+        # Static-frame gate: frames whose 64x64 gray thumbnail differs from the last
+        # analyzed one by less than static_threshold reuse its result, with a full
+        # analysis forced every full_analysis_interval frames
+        self.static_threshold = static_threshold
+        self.full_analysis_interval = full_analysis_interval
+        self.reference_thumbnail = None
+        self.frames_since_analysis = 0
+        self.last_result = None
+        
+        # Asynchronous pipeline (see start): capture -> analysis -> drawing through
+        # bounded queues that drop the oldest frame when a stage falls behind
+        self.analysis_queue = queue.Queue(maxsize=2)
+        self.draw_queue = queue.Queue(maxsize=2)
+        self.pipeline_stop = threading.Event()
+        self.pipeline_threads = []
+        self.latest_output = None
+        self.latest_output_lock = threading.Lock()
+        
         self.metrics = {
             'total_frames': 0,
             'objects_detected': 0,
             'faces_detected': 0,
-            'poses_detected': 0,
-            'processing_times': []
+            'poses_detected': 0
         }
+        
+        # Fixed-size ring buffer of the most recent processing times
+        self.processing_times = np.zeros(100, np.float64)
+        self.processing_times_index = 0
+        self.processing_times_count = 0
     
-    def process_frame(self, frame: np.ndarray) -> Tuple[np.ndarray, Dict]:
-        """Process a single frame and return annotated frame with analytics"""
-        start_time = time.time()
+    def process_frame(self, frame: np.ndarray, inplace: bool = False) -> Tuple[np.ndarray, Dict]:
+        """Process a single frame and return annotated frame with analytics; with inplace the
+        annotations are drawn on frame itself, otherwise on a buffer reused by the next call.
+        While the pipeline is started this only queues the frame and returns the newest output.
+        processing_time covers analysis and drawing"""
+        if self.pipeline_threads:
+            self.push_frame(frame)
+            return self.latest_result() or (frame, {})
+        
+        start_ns = time.perf_counter_ns()
         
-        # Perform comprehensive analysis
-        analysis_result = self.analyzer.comprehensive_analysis(frame)
+        # Perform comprehensive analysis, unless the scene has not changed
+        if self.needs_analysis(frame):
+            analysis_result = self.analyzer.comprehensive_analysis(frame)
+            self.last_result = analysis_result
+        else:
+            analysis_result = self.reuse_last_result()
         
         # Draw annotations
-        annotated_frame = self.analyzer.draw_annotations(frame, analysis_result)
+        annotated_frame = self.analyzer.draw_annotations(frame, analysis_result, inplace=inplace)
         
         # Update metrics
+        analysis_result['processing_time'] = (time.perf_counter_ns() - start_ns) / 1e9
         self.update_metrics(analysis_result)
         
-        processing_time = time.time() - start_time
-        analysis_result['total_processing_time'] = processing_time
-        
         return annotated_frame, analysis_result
     
+    def process_frames_batch(self, frames: List[np.ndarray]) -> List[Tuple[np.ndarray, Dict]]:
+        """Process several frames with a single batched YOLO call; results keep the input order"""
+        start_ns = time.perf_counter_ns()
+        
+        # Only frames that pass the static-frame gate go through YOLO
+        analyze = [self.needs_analysis(frame) for frame in frames]
+        analyzed_frames = [frame for frame, needed in zip(frames, analyze) if needed]
+        batch_objects = iter(self.analyzer.detect_objects_batch(analyzed_frames))
+        detection_ns = (time.perf_counter_ns() - start_ns) // max(len(analyzed_frames), 1)
+        
+        outputs = []
+        for frame, needed in zip(frames, analyze):
+            # Each analyzed frame is charged an equal share of the batched detection
+            frame_start_ns = time.perf_counter_ns() - (detection_ns if needed else 0)
+            if needed:
+                analysis_result = self.analyzer.comprehensive_analysis(frame, objects=next(batch_objects))
+                self.last_result = analysis_result
+            else:
+                analysis_result = self.reuse_last_result()
+            # Every frame of the batch is returned, so each needs its own output array
+            annotated_frame = self.analyzer.draw_annotations(frame.copy(), analysis_result, inplace=True)
+            
+            analysis_result['processing_time'] = (time.perf_counter_ns() - frame_start_ns) / 1e9
+            self.update_metrics(analysis_result)
+            outputs.append((annotated_frame, analysis_result))
+        
+        return outputs
+    
+    def start(self):
+        """Start the analysis and drawing threads so capture never waits on either"""
+        if self.pipeline_threads:
+            return
+        
+        self.pipeline_stop.clear()
+        self.pipeline_threads = [
+            threading.Thread(target=self._analysis_worker, daemon=True),
+            threading.Thread(target=self._draw_worker, daemon=True)
+        ]
+        for thread in self.pipeline_threads:
+            thread.start()
+    
+    def stop(self):
+        """Stop the pipeline threads; frames still queued are discarded"""
+        self.pipeline_stop.set()
+        for thread in self.pipeline_threads:
+            thread.join()
+        self.pipeline_threads = []
+    
+    def push_frame(self, frame: np.ndarray):
+        """Queue a frame for the pipeline without blocking; it is annotated in place, so the
+        caller must not reuse its buffer"""
+        self._put_latest(self.analysis_queue, (frame, time.perf_counter_ns()))
+    
+    def latest_result(self) -> Optional[Tuple[np.ndarray, Dict]]:
+        """Newest annotated frame and analysis from the pipeline, or None before the first"""
+        with self.latest_output_lock:
+            return self.latest_output
+    
+    @staticmethod
+    def _put_latest(target: queue.Queue, item):
+        """Put without blocking, dropping the oldest queued item when the queue is full"""
+        while True:
+            try:
+                target.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    target.get_nowait()
+                except queue.Empty:
+                    pass
+    
+    def _analysis_worker(self):
+        """Run the detectors on queued frames until stopped"""
+        while not self.pipeline_stop.is_set():
+            try:
+                frame, queued_at = self.analysis_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            
+            try:
+                if self.needs_analysis(frame):
+                    analysis_result = self.analyzer.comprehensive_analysis(frame)
+                    self.last_result = analysis_result
+                else:
+                    analysis_result = self.reuse_last_result()
+                self._put_latest(self.draw_queue, (frame, analysis_result, queued_at))
+            except Exception as e:
+                logger.error(f"Analysis worker failed: {e}")
+    
+    def _draw_worker(self):
+        """Draw annotations for analyzed frames and publish the newest result until stopped"""
+        while not self.pipeline_stop.is_set():
+            try:
+                frame, analysis_result, queued_at = self.draw_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            
+            try:
+                annotated_frame = self.analyzer.draw_annotations(frame, analysis_result, inplace=True)
+                # Latency from push to drawn, including time spent queued
+                analysis_result['processing_time'] = (time.perf_counter_ns() - queued_at) / 1e9
+                self.update_metrics(analysis_result)
+                with self.latest_output_lock:
+                    self.latest_output = (annotated_frame, analysis_result)
+            except Exception as e:
+                logger.error(f"Draw worker failed: {e}")
+    
+    def needs_analysis(self, frame: np.ndarray) -> bool:
+        """Static-frame gate: mean absolute difference of a 64x64 gray thumbnail against the
+        last analyzed frame; True when the frame must go through the detectors"""
+        thumbnail = cv2.cvtColor(cv2.resize(frame, (64, 64), interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+        self.frames_since_analysis += 1
+        
+        # Comparing against the last analyzed frame (not the previous one) means a
+        # slow drift still triggers analysis once it adds up
+        if (self.reference_thumbnail is not None
+                and self.frames_since_analysis < self.full_analysis_interval
+                and cv2.mean(cv2.absdiff(thumbnail, self.reference_thumbnail))[0] < self.static_threshold):
+            return False
+        
+        self.reference_thumbnail = thumbnail
+        self.frames_since_analysis = 0
+        return True
+    
+    def reuse_last_result(self) -> Dict:
+        """Copy of the last analysis result for a static frame"""
+        return dict(self.last_result, timestamp=time.time())
+    
+    def submit_frame(self, frame: np.ndarray) -> List[Tuple[np.ndarray, Dict]]:
+        """Queue a frame; once batch_size frames are queued they are processed together and returned"""
+        self.frame_buffer.append(frame)
+        if len(self.frame_buffer) < self.batch_size:
+            return []
+        return self.flush()
+    
+    def flush(self) -> List[Tuple[np.ndarray, Dict]]:
+        """Process whatever frames are still queued"""
+        frames = list(self.frame_buffer)
+        self.frame_buffer.clear()
+        return self.process_frames_batch(frames) if frames else []
+    
     def update_metrics(self, analysis_result: Dict):
         """Update analytics metrics"""
         self.metrics['total_frames'] += 1
         self.metrics['objects_detected'] += len(analysis_result.get('objects', []))
-        self.metrics['faces_detected'] += 1 if analysis_result.get('face_mesh', {}).get('landmarks') else 0
-        self.metrics['poses_detected'] += 1 if analysis_result.get('pose', {}).get('landmarks') else 0
-        self.metrics['processing_times'].append(analysis_result.get('processing_time', 0))
+        self.metrics['faces_detected'] += 1 if 'landmarks' in analysis_result.get('face_mesh', {}) else 0
+        self.metrics['poses_detected'] += 1 if 'landmarks' in analysis_result.get('pose', {}) else 0
         
-        # Keep only last 100 processing times for average calculation
-        if len(self.metrics['processing_times']) > 100:
-            self.metrics['processing_times'] = self.metrics['processing_times'][-100:]
+        # Overwrite the oldest slot once the last 100 processing times are held
+        window = len(self.processing_times)
+        self.processing_times[self.processing_times_index] = analysis_result.get('processing_time', 0)
+        self.processing_times_index = (self.processing_times_index + 1) % window
+        self.processing_times_count = min(self.processing_times_count + 1, window)
     
     def get_analytics_summary(self) -> Dict:
         """Get analytics summary"""
-        avg_processing_time = np.mean(self.metrics['processing_times']) if self.metrics['processing_times'] else 0
+        count = self.processing_times_count
+        avg_processing_time = float(self.processing_times[:count].mean()) if count else 0
         
         return {
             'total_frames_processed': self.metrics['total_frames'],
@@ -364,6 +915,10 @@ class RealTimeAnalytics:
             'total_frames': 0,
             'objects_detected': 0,
             'faces_detected': 0,
-            'poses_detected': 0,
-            'processing_times': []
+            'poses_detected': 0
         }
+        
+        # Fixed-size ring buffer of the most recent processing times
+        self.processing_times = np.zeros(100, np.float64)
+        self.processing_times_index = 0
+        self.processing_times_count = 0